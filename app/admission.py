@@ -0,0 +1,91 @@
+"""
+Admission control for search endpoints.
+Per-client token-bucket rate limiting plus a global concurrency cap that
+sheds load before the database connection pool is exhausted.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Sustained searches per second allowed per client IP, and burst size
+SEARCH_RATE_PER_SEC = float(os.getenv("SEARCH_RATE_PER_SEC", "5"))
+SEARCH_RATE_BURST = int(os.getenv("SEARCH_RATE_BURST", "20"))
+# Concurrent searches allowed per worker (keep below pool_size + max_overflow)
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "24"))
+# Number of client buckets kept in memory (least recently seen are evicted)
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+# Proxies in front of the app that append to X-Forwarded-For (0 = use the socket peer)
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+
+class TokenBucketLimiter:
+    """Token bucket per client key, with LRU eviction of idle clients."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, last_refill]
+
+    def acquire(self, key: str, now: float = None, cost: float = 1.0) -> float:
+        """
+        Take cost tokens (at most the burst size) for key.
+        
+        Returns:
+            0.0 if the request is allowed, otherwise seconds until enough tokens are available
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.burst)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / self.rate
+
+class ConcurrencyLimiter:
+    """Global cap on in-progress requests; rejects instead of queueing."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+    def try_acquire(self) -> bool:
+        """Claim a slot without waiting; False means the caller should shed the request."""
+        if self._semaphore is None:
+            return True
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+def retry_after_header(seconds: float) -> str:
+    """Format a Retry-After value (whole seconds, at least 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+def client_address(forwarded_for: Optional[str], peer: str, trusted_hops: int = TRUSTED_PROXY_HOPS) -> str:
+    """
+    The client address as seen by the outermost trusted proxy.
+    Clients can put anything at the start of X-Forwarded-For, so the address is
+    taken trusted_hops entries from the right, where the proxies appended it.
+    """
+    hops = [ip.strip() for ip in (forwarded_for or "").split(",") if ip.strip()]
+    if trusted_hops <= 0 or not hops:
+        return peer
+    return hops[-min(trusted_hops, len(hops))]
@@ -0,0 +1,96 @@
+"""
+Optional BM25 ranking for full-text search (SEARCH_RANKER=bm25).
+ts_rank_cd has no IDF, so rare words count no more than filler. BM25 weights
+each query lexeme by how rare it is in the corpus; document frequencies and
+the average document length are computed by the importer into term_stats and
+corpus_stats, so a query only looks up its own few lexemes. Candidates still
+come from the GIN index and are scored in the same statement.
+"""
+import os
+
+# "ts_rank_cd" (default) or "bm25"
+SEARCH_RANKER = os.getenv("SEARCH_RANKER", "ts_rank_cd")
+# Term-frequency saturation and document-length normalization
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Document length is the number of distinct lexemes, which tsvector stores in
+# its header, so it costs nothing per candidate
+REFRESH_STATS_SQL = [
+    "DELETE FROM term_stats",
+    """
+    INSERT INTO term_stats (lexeme, ndoc)
+    SELECT word, ndoc FROM ts_stat('SELECT to_tsvector(''english'', text) FROM quotes')
+    """,
+    "DELETE FROM corpus_stats",
+    """
+    INSERT INTO corpus_stats (doc_count, avg_length)
+    SELECT COUNT(*), COALESCE(AVG(length(to_tsvector('english', text))), 0) FROM quotes
+    """,
+]
+
+def refresh_stats(conn):
+    """Recompute BM25 corpus statistics from the quotes corpus (run by the importer)."""
+    from sqlalchemy import text
+
+    for statement in REFRESH_STATS_SQL:
+        conn.execute(text(statement))
+
+def bm25_search_sql(use_phrase: bool, speaker_filter: bool = False) -> str:
+    """
+    FTS candidate query ranked by BM25, selecting phrase_rank and word_rank
+    like search_quotes' ts_rank_cd queries (ORDER BY is left to the caller).
+    Scores are squashed to score / (score + 1) like ts_rank_cd's
+    normalization 32, which keeps the exact-match tiers on top.
+    """
+    if use_phrase:
+        phrase_rank = "CASE WHEN c.doc @@ phraseto_tsquery('english', :query) THEN s.rank ELSE 0.0 END"
+        condition = """(
+                to_tsvector('english', text) @@ phraseto_tsquery('english', :query)
+                OR to_tsvector('english', text) @@ plainto_tsquery('english', :query)
+            )"""
+    else:
+        phrase_rank = "0.0"
+        condition = "to_tsvector('english', text) @@ plainto_tsquery('english', :query)"
+    if speaker_filter:
+        condition += " AND speaker = :speaker"
+    return f"""
+        WITH corpus AS MATERIALIZED (
+            -- Neutral statistics until the importer has filled corpus_stats
+            SELECT COALESCE(MAX(doc_count), 1) AS doc_count, COALESCE(MAX(avg_length), 1) AS avg_length
+            FROM corpus_stats
+        ),
+        terms AS MATERIALIZED (
+            -- The query's lexemes and their IDFs, as parallel arrays
+            SELECT array_agg(l.lexeme) AS lexemes,
+                   array_agg(LN(1 + (corpus.doc_count - COALESCE(t.ndoc, 0) + 0.5) / (COALESCE(t.ndoc, 0) + 0.5))) AS idfs,
+                   MAX(corpus.avg_length) AS avg_length
+            FROM unnest(tsvector_to_array(to_tsvector('english', :query))) AS l(lexeme)
+            CROSS JOIN corpus
+            LEFT JOIN term_stats t ON t.lexeme = l.lexeme
+        )
+        SELECT
+            c.id, c.episode_id, c.timestamp_sec, c.speaker, c.text,
+            c.episode_name, c.spotify_url,
+            {phrase_rank} AS phrase_rank,
+            s.rank AS word_rank
+        FROM (
+            -- OFFSET 0 keeps each candidate's tsvector from being recomputed per use
+            SELECT *, to_tsvector('english', text) AS doc
+            FROM quotes
+            WHERE {condition}
+            OFFSET 0
+        ) c
+        CROSS JOIN terms
+        CROSS JOIN LATERAL (
+            SELECT (score / (score + 1))::real AS rank
+            FROM (
+                SELECT COALESCE(SUM(
+                    terms.idfs[array_position(terms.lexemes, u.lexeme)] * cardinality(u.positions) * ({BM25_K1} + 1)
+                    / (cardinality(u.positions) + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * length(c.doc) / terms.avg_length))
+                ), 0) AS score
+                FROM unnest(c.doc) u
+                WHERE u.lexeme = ANY(terms.lexemes)
+            ) bm25
+        ) s
+    """
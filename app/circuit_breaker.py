@@ -0,0 +1,79 @@
+"""
+Circuit breaker for the database.
+After repeated failures (errors or timeouts) calls are short-circuited for a
+cool-down period, then a single trial call decides whether to close again.
+Callers must end every allowed call with record_success, record_failure or
+release_trial, so a trial that ends any other way doesn't block recovery.
+"""
+import os
+import threading
+import time
+from app import metrics
+
+DB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5"))
+DB_BREAKER_RESET_TIMEOUT = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Classic closed → open → half-open breaker, safe to share between threads."""
+
+    def __init__(self, name: str, failure_threshold: int = DB_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = DB_BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._trial_owner = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call should be attempted (False means use the fallback)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Cool-down over: let exactly one trial call through
+            if self._trial_in_progress:
+                return False
+            self._state = HALF_OPEN
+            self._trial_in_progress = True
+            self._trial_owner = threading.get_ident()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                metrics.incr(f"breaker.{self.name}.closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    metrics.incr(f"breaker.{self.name}.opened")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def release_trial(self):
+        """End this thread's trial without an outcome (e.g. cancelled), so another may run."""
+        with self._lock:
+            if self._trial_in_progress and self._trial_owner == threading.get_ident():
+                self._trial_in_progress = False
@@ -1,39 +1,139 @@
 """
 PostgreSQL database configuration and connection management.
 Optimized for production deployment with connection pooling.
+
+Reads (search, stats) and writes (analytics inserts, imports) use separate
+engines with independent pools; reads can be spread over replicas.
 """
+import itertools
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 
 # Load environment variables from .env file
 load_dotenv()
 
+class DatabaseNotConfigured(ValueError):
+    """DATABASE_URL is not set; only the local snapshot can serve searches."""
+
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL environment variable is required")
-
-# Create engine with connection pooling for production
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,  # Number of connections to maintain
-    max_overflow=20,  # Additional connections when pool is exhausted
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    echo=False  # Set to True for SQL debugging
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Optional comma-separated read replica URLs for search/stats (default: the primary)
+DATABASE_READ_URLS = [u.strip() for u in os.getenv("DATABASE_READ_URL", "").split(",") if u.strip()]
+# Fail fast when the server is unreachable so callers can fall back (seconds)
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# Pool sizes: the write pool only serves analytics inserts and imports
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "5"))
+DB_WRITE_MAX_OVERFLOW = int(os.getenv("DB_WRITE_MAX_OVERFLOW", "5"))
+# Per read engine (each replica gets its own pool of this size)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
+# How long a replica that failed to connect is skipped (seconds)
+DB_READ_RETRY_INTERVAL = float(os.getenv("DB_READ_RETRY_INTERVAL", "30"))
+
+def _create_engine(url: str, pool_size: int, max_overflow: int):
+    """Create engine with connection pooling for production."""
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=pool_size,  # Number of connections to maintain
+        max_overflow=max_overflow,  # Additional connections when pool is exhausted
+        pool_pre_ping=True,  # Verify connections before use
+        pool_recycle=3600,  # Recycle connections after 1 hour
+        connect_args={"connect_timeout": DB_CONNECT_TIMEOUT},
+        echo=False  # Set to True for SQL debugging
+    )
+
+class ReadEngines:
+    """Round-robin over read engines, skipping ones that recently failed to connect."""
+
+    def __init__(self, urls, fallback_engine):
+        self.engines = [_create_engine(url, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW) for url in urls]
+        self.fallback_engine = fallback_engine
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._down_until = [0.0] * len(self.engines)
+
+    def connect(self):
+        """Connect to the next healthy read engine (the primary as a last resort)."""
+        now = time.monotonic()
+        start = next(self._counter)
+        last_error = None
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._down_until[index] > now:
+                continue
+            try:
+                return self.engines[index].connect()
+            except OperationalError as e:
+                last_error = e
+                with self._lock:
+                    self._down_until[index] = now + DB_READ_RETRY_INTERVAL
+                print(f"Read engine {index} unavailable, skipping for {DB_READ_RETRY_INTERVAL:.0f}s: {e}")
+        if self.fallback_engine is not None:
+            return self.fallback_engine.connect()
+        if last_error is not None:
+            raise last_error
+        raise OperationalError("connect", {}, Exception("no healthy read engines"))
+
+    def health(self):
+        """Per-engine status for diagnostics."""
+        now = time.monotonic()
+        return [
+            {"engine": i, "healthy": self._down_until[i] <= now, "pool": self.engines[i].pool.status()}
+            for i in range(len(self.engines))
+        ]
+
+# Engines are created on first use so importing this module (CLI tools, tests,
+# app cold start) never touches the network
+_engine = None
+_read_engines = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Primary (write) engine: analytics inserts, imports and schema changes."""
+    global _engine
+    if _engine is None:
+        if not DATABASE_URL:
+            raise DatabaseNotConfigured("DATABASE_URL environment variable is required")
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(DATABASE_URL, DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW)
+    return _engine
+
+def get_read_engines() -> ReadEngines:
+    """
+    Read engines: replicas if configured, otherwise a separate pool on the primary so
+    analytics writes can never take connections away from searches.
+    """
+    global _read_engines
+    if _read_engines is None:
+        primary = get_engine()
+        with _engine_lock:
+            if _read_engines is None:
+                _read_engines = ReadEngines(
+                    DATABASE_READ_URLS or [DATABASE_URL],
+                    fallback_engine=primary if DATABASE_READ_URLS else None,
+                )
+    return _read_engines
+
+def read_engines_health():
+    """Read engine health, without creating engines that haven't been used yet."""
+    return _read_engines.health() if _read_engines is not None else []
 
 @contextmanager
 def get_db_session():
     """Context manager for database sessions."""
-    session = SessionLocal()
+    # The ORM is only needed here; importing it lazily keeps module import cheap
+    from sqlalchemy.orm import Session
+
+    session = Session(bind=get_engine(), autoflush=False)
     try:
         yield session
         session.commit()
@@ -44,80 +144,14 @@ def get_db_session():
         session.close()
 
 def init_database():
-    """Initialize PostgreSQL database tables and indexes."""
-    with get_db_session() as session:
-        # PostgreSQL schema
-        session.execute(text("""
-            CREATE TABLE IF NOT EXISTS quotes (
-                id SERIAL PRIMARY KEY,
-                episode_id VARCHAR(50) NOT NULL,
-                timestamp_sec INTEGER NOT NULL,
-                speaker VARCHAR(200) NOT NULL,
-                text TEXT NOT NULL,
-                episode_name TEXT,
-                spotify_url TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """))
-        
-        # PostgreSQL indexes
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_quotes_speaker 
-            ON quotes(speaker);
-        """))
-        
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_quotes_episode_timestamp 
-            ON quotes(episode_id, timestamp_sec);
-        """))
-        
-        # PostgreSQL full-text search index
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_quotes_text_gin 
-            ON quotes USING gin(to_tsvector('english', text));
-        """))
-        
-        # Search log table
-        session.execute(text("""
-            CREATE TABLE IF NOT EXISTS search_log (
-                id SERIAL PRIMARY KEY,
-                ts INTEGER NOT NULL,
-                query TEXT NOT NULL,
-                topk INTEGER NOT NULL,
-                ip VARCHAR(45),
-                user_agent TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """))
-        
-        # Search analytics index
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_search_log_ts 
-            ON search_log(ts);
-        """))
-        
-        # Visitors tracking table
-        session.execute(text("""
-            CREATE TABLE IF NOT EXISTS visitors (
-                id SERIAL PRIMARY KEY,
-                ip VARCHAR(45) NOT NULL,
-                user_agent TEXT,
-                path VARCHAR(500),
-                visited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """))
-        
-        # Visitors analytics indexes
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_visitors_ip 
-            ON visitors(ip);
-        """))
-        
-        session.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_visitors_visited_at 
-            ON visitors(visited_at);
-        """))
+    """Bring the schema up to date by applying any pending migrations (see app/migrations.py)."""
+    from app.migrations import apply_migrations
+    return apply_migrations(verbose=False)
 
 def get_connection():
-    """Get a raw database connection for complex queries."""
-    return engine.connect()
+    """Get a raw connection to the primary (for writes and imports)."""
+    return get_engine().connect()
+
+def get_read_connection():
+    """Get a raw connection for read-only queries (search, stats), from a replica if configured."""
+    return get_read_engines().connect()
@@ -0,0 +1,66 @@
+"""
+Dataset version tracking.
+The importer records a content hash of the corpus; the API reads it back
+(cached in memory) to key HTTP caches and other derived data.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Iterable, Optional
+from sqlalchemy import text
+from app.database import get_read_connection
+
+# How long the API trusts its cached copy of the dataset version (seconds)
+DATASET_VERSION_TTL = float(os.getenv("DATASET_VERSION_TTL", "30"))
+
+_lock = threading.Lock()
+_cached_version: Optional[str] = None
+_cached_at: Optional[float] = None
+
+def compute_version(rows: Iterable[dict]) -> str:
+    """
+    Hash imported rows into a short, stable dataset version string.
+    Rows should include their database id, since responses and cursors expose it.
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update("\x1f".join(str(row[k]) for k in sorted(row)).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:16]
+
+def record_dataset_version(conn, version: str):
+    """Store the dataset version (call inside the importer's transaction)."""
+    conn.execute(text("""
+        INSERT INTO dataset_meta (key, value, updated_at)
+        VALUES ('version', :version, CURRENT_TIMESTAMP)
+        ON CONFLICT (key) DO UPDATE
+        SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+    """), {"version": version})
+
+def _load_version() -> Optional[str]:
+    with get_read_connection() as conn:
+        row = conn.execute(text("SELECT value FROM dataset_meta WHERE key = 'version'")).fetchone()
+        if row:
+            return row.value
+        # Databases imported before versioning: fall back to a cheap fingerprint
+        row = conn.execute(text("SELECT COUNT(*) AS n, COALESCE(MAX(id), 0) AS max_id FROM quotes")).fetchone()
+        return f"legacy-{row.n}-{row.max_id}"
+
+def get_dataset_version() -> Optional[str]:
+    """Return the current dataset version, refreshing at most every DATASET_VERSION_TTL seconds."""
+    global _cached_version, _cached_at
+    now = time.monotonic()
+    if _cached_at is not None and now - _cached_at < DATASET_VERSION_TTL:
+        return _cached_version
+    with _lock:
+        if _cached_at is not None and now - _cached_at < DATASET_VERSION_TTL:
+            return _cached_version
+        try:
+            _cached_version = _load_version()
+        except Exception as e:
+            # Without a version we simply don't emit cache validators
+            print(f"Failed to load dataset version: {e}")
+        # Also back off after failures so a down database isn't hit on every request
+        _cached_at = now
+        return _cached_version
@@ -0,0 +1,87 @@
+"""
+Per-request time budgets and cancellation for database queries.
+A SearchDeadline turns the remaining budget into a per-statement
+statement_timeout and can cancel the running backend query from another thread.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+# Default and maximum time budget for a search request (milliseconds)
+SEARCH_TIME_BUDGET_MS = int(os.getenv("SEARCH_TIME_BUDGET_MS", "3000"))
+# Below this much remaining budget, optional stages (the exact-match probe) are skipped
+OPTIONAL_STAGE_MIN_MS = int(os.getenv("OPTIONAL_STAGE_MIN_MS", "500"))
+
+# PostgreSQL SQLSTATE for "canceling statement due to statement timeout / user request"
+QUERY_CANCELED = "57014"
+
+class SearchTimeout(Exception):
+    """The search ran out of its time budget."""
+
+class SearchCancelled(Exception):
+    """The search was cancelled (e.g. the client went away)."""
+
+class SearchDeadline:
+    """Time budget for one search, shared by all of its statements."""
+
+    def __init__(self, budget_ms: int = SEARCH_TIME_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000
+        self.partial = False  # set when optional stages were skipped or timed out
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._dbapi_connection = None
+
+    def remaining_ms(self) -> int:
+        return max(0, int((self.expires_at - time.monotonic()) * 1000))
+
+    def check(self):
+        """Raise if the search was cancelled or the budget is spent."""
+        if self.cancelled:
+            raise SearchCancelled()
+        if self.remaining_ms() <= 0:
+            raise SearchTimeout()
+
+    def allows_optional_stage(self) -> bool:
+        """Whether there is enough budget left for a nice-to-have query."""
+        return self.remaining_ms() >= OPTIONAL_STAGE_MIN_MS
+
+    def statement_timeout_sql(self, fraction: float = 1.0) -> str:
+        """SET LOCAL statement for the next query, capped at a fraction of what is left."""
+        self.check()
+        timeout_ms = max(1, int(self.remaining_ms() * fraction))
+        return f"SET LOCAL statement_timeout = {timeout_ms};"
+
+    def attach(self, connection):
+        """Remember the DBAPI connection running this search so cancel() can reach it."""
+        with self._lock:
+            self._dbapi_connection = connection.connection.dbapi_connection
+        if self.cancelled:
+            self.cancel()
+
+    def detach(self):
+        with self._lock:
+            self._dbapi_connection = None
+
+    def cancel(self):
+        """Cancel the in-progress backend query (safe to call from any thread)."""
+        self.cancelled = True
+        with self._lock:
+            dbapi_connection = self._dbapi_connection
+        if dbapi_connection is not None and hasattr(dbapi_connection, "cancel"):
+            try:
+                dbapi_connection.cancel()
+            except Exception as e:
+                print(f"Failed to cancel query: {e}")
+
+def is_query_canceled(error: Exception) -> bool:
+    """True if a DBAPI/SQLAlchemy error is PostgreSQL's query_canceled."""
+    orig = getattr(error, "orig", error)
+    return getattr(orig, "pgcode", None) == QUERY_CANCELED
+
+def translate_cancellation(error: Exception, deadline: Optional[SearchDeadline]) -> Exception:
+    """Map a query_canceled error to SearchCancelled/SearchTimeout (other errors pass through)."""
+    if deadline is None or not is_query_canceled(error):
+        return error
+    return SearchCancelled() if deadline.cancelled else SearchTimeout()
@@ -0,0 +1,59 @@
+"""
+Streaming encoders for exporting full match lists.
+Rows are grouped into chunks so each write to the client carries many rows,
+and nothing but the current chunk is held in memory.
+"""
+import csv
+import io
+import os
+from typing import Iterable, Iterator
+from app.responses import dumps
+
+# Hard cap on rows in one export (a request can ask for fewer)
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "50000"))
+# Rows fetched from the server-side cursor per round trip
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+# Rows encoded into each chunk written to the client
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "500"))
+# Concurrent exports allowed per worker (each holds a read connection while streaming)
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", "2"))
+
+EXPORT_COLUMNS = ["episode_id", "episode_name", "timestamp_sec", "timestamp_hms",
+                  "speaker", "text", "spotify_url"]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def ndjson_chunks(rows: Iterable[dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON."""
+    buffer = []
+    for row in rows:
+        buffer.append(dumps(row))
+        if len(buffer) >= chunk_rows:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+def csv_chunks(rows: Iterable[dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    if output.tell():
+        yield output.getvalue().encode("utf-8")
+
+def encode_rows(rows: Iterable[dict], format: str) -> Iterator[bytes]:
+    """Chunked encoder for an EXPORT_FORMATS key."""
+    return csv_chunks(rows) if format == "csv" else ndjson_chunks(rows)
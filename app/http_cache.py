@@ -0,0 +1,34 @@
+"""
+HTTP caching helpers: strong ETags keyed on the dataset version and
+Cache-Control policies for read-only API endpoints.
+"""
+import hashlib
+import os
+from typing import Optional
+
+SEARCH_CACHE_MAX_AGE = int(os.getenv("SEARCH_CACHE_MAX_AGE", "300"))
+STATS_CACHE_MAX_AGE = int(os.getenv("STATS_CACHE_MAX_AGE", "3600"))
+
+def cache_control(max_age: int) -> str:
+    """Cache-Control value for responses that only change on re-import."""
+    # Allow shared caches (CDN) and let them serve stale while revalidating
+    return f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+
+def make_etag(version: str, *parts) -> str:
+    """Build a strong ETag from the dataset version and request parameters."""
+    key = "\x1f".join([version] + ["" if p is None else str(p) for p in parts])
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -1,19 +1,131 @@
 # FastAPI application with PostgreSQL backend
-from fastapi import FastAPI, Query, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Query, HTTPException, Request, Depends
+from fastapi.responses import Response, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request as StarletteRequest
 from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
 import os
 
 # Load environment variables from .env file
 load_dotenv()
 
-from app.search_core import search_quotes, log_search, get_stats, log_visit
-from app.database import init_database
+from app.search_core import search_quotes, search_quotes_batch, search_substring, substring_pattern, iter_matches, get_context, get_transcript_page, episode_exists, log_search, log_searches, get_stats, log_visit, normalize_query
+from app.pagination import (
+    TTLCache, InvalidCursor, sort_candidates, query_fingerprint, encode_cursor, decode_cursor, page_after,
+    resume_index, next_fetch_depth, encode_token, decode_token,
+    SEARCH_PAGE_MAX_RESULTS, SEARCH_PAGE_CACHE_SIZE, SEARCH_PAGE_CACHE_TTL,
+)
+from app.export import EXPORT_FORMATS, EXPORT_MAX_ROWS, EXPORT_FETCH_SIZE, EXPORT_MAX_CONCURRENCY, encode_rows
+from app.migrations import check_schema
+from app.query_syntax import query_key
+from app.profiling import SearchProfiler, DUMP_FORMATS, profiling_allowed
+from app.dataset import get_dataset_version
+from app.http_cache import cache_control, make_etag, etag_matches, SEARCH_CACHE_MAX_AGE, STATS_CACHE_MAX_AGE
+from app.responses import FastJSONResponse
+from app.compression import CompressionMiddleware
+from app.static_assets import SPAStaticFiles
+from app.singleflight import SingleFlight
+from app.deadlines import SearchDeadline, SearchTimeout, SearchCancelled, SEARCH_TIME_BUDGET_MS, is_query_canceled
+from app.circuit_breaker import CircuitBreaker
+from app.database import DatabaseNotConfigured, read_engines_health
+from app import snapshot
+from app import suggest as suggestions
+from app import spelling
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError
+from app import metrics
+from app.admission import (
+    TokenBucketLimiter, ConcurrencyLimiter, retry_after_header, client_address,
+    SEARCH_RATE_PER_SEC, SEARCH_RATE_BURST, SEARCH_MAX_CONCURRENCY,
+)
 
-app = FastAPI(title="XFM Quote Finder")
+app = FastAPI(title="XFM Quote Finder", default_response_class=FastJSONResponse)
+
+# Identical concurrent searches share one database execution
+search_flight = SingleFlight("search")
+
+# Ranked candidate lists for paginated search, keyed by (version, query key, speaker),
+# as (candidates, fetched depth, complete)
+page_candidates = TTLCache(SEARCH_PAGE_CACHE_SIZE, SEARCH_PAGE_CACHE_TTL)
+
+# Trips after repeated database failures so searches go straight to the snapshot
+db_breaker = CircuitBreaker("database")
+
+# Errors that mean "the database is down or too slow", as opposed to bad input
+DATABASE_FAILURES = (SQLAlchemyError, SearchTimeout, DatabaseNotConfigured)
+# Errors that mean the database can't be reached at all; only these (and timeouts
+# at the server's full budget) count towards tripping db_breaker
+CONNECTION_FAILURES = (OperationalError, InterfaceError, DatabaseNotConfigured)
+
+# Per-client rate limiting and global load shedding for search
+search_rate_limiter = TokenBucketLimiter(SEARCH_RATE_PER_SEC, SEARCH_RATE_BURST)
+search_concurrency = ConcurrencyLimiter(SEARCH_MAX_CONCURRENCY)
+export_concurrency = ConcurrencyLimiter(EXPORT_MAX_CONCURRENCY)
+
+# Most searches accepted in one POST /api/search/batch request
+SEARCH_BATCH_MAX_ITEMS = int(os.getenv("SEARCH_BATCH_MAX_ITEMS", "50"))
+# Largest top_k a batch item may ask for
+SEARCH_BATCH_MAX_TOP_K = int(os.getenv("SEARCH_BATCH_MAX_TOP_K", "50"))
+
+# Most lines of surrounding dialogue returned on each side of a quote
+CONTEXT_MAX_LINES = int(os.getenv("CONTEXT_MAX_LINES", "5"))
+# Most anchors accepted by one /api/context request
+CONTEXT_MAX_ANCHORS = int(os.getenv("CONTEXT_MAX_ANCHORS", "50"))
+
+# Search modes: full-text (stemmed words), substring, and * / ? wildcard patterns
+SEARCH_MODES = ("fts", "substring", "wildcard")
+
+# Searches with fewer hits than this get a spelling suggestion
+SPELLING_FEW_RESULTS = int(os.getenv("SPELLING_FEW_RESULTS", "3"))
+
+# How often a waiting search checks whether its client is still connected (seconds)
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.1"))
+
+def get_client_ip(request: StarletteRequest) -> str:
+    """Extract the client IP address (handle proxies/load balancers)."""
+    peer = request.client.host if request.client else "unknown"
+    return client_address(request.headers.get("X-Forwarded-For"), peer)
+
+def is_client_timeout(error: Exception, deadline: Optional[SearchDeadline]) -> bool:
+    """True if a search ran out of a budget the client shortened (budget_ms below the server's)."""
+    timed_out = isinstance(error, SearchTimeout) or is_query_canceled(error)
+    return timed_out and deadline is not None and deadline.budget_ms < SEARCH_TIME_BUDGET_MS
+
+def is_breaker_failure(error: Exception, deadline: Optional[SearchDeadline] = None) -> bool:
+    """
+    Whether a failed call says the database is unhealthy. Clients choose budget_ms,
+    so timeouts only count when the search had the server's full budget.
+    """
+    if isinstance(error, SearchTimeout) or is_query_canceled(error):
+        return not is_client_timeout(error, deadline)
+    return isinstance(error, CONNECTION_FAILURES)
+
+def admit_search(request: Request, cost: float = 1.0, limiter: ConcurrencyLimiter = None):
+    """
+    Reject over-limit clients (429) and shed load when search is saturated (503).
+    On success a slot in limiter (default: search_concurrency) is held; the caller must release it.
+    """
+    limiter = limiter or search_concurrency
+    retry_after = search_rate_limiter.acquire(get_client_ip(request), cost=cost)
+    if retry_after:
+        metrics.incr("admission.rate_limited")
+        raise HTTPException(status_code=429, detail="Too many searches, slow down",
+                            headers={"Retry-After": retry_after_header(retry_after)})
+    if not limiter.try_acquire():
+        metrics.incr("admission.shed")
+        raise HTTPException(status_code=503, detail="Search is busy, try again shortly",
+                            headers={"Retry-After": "1"})
+    metrics.incr("admission.admitted")
+
+async def search_admission(request: Request):
+    """Admission control for a single search (see admit_search)."""
+    admit_search(request)
+    try:
+        yield
+    finally:
+        search_concurrency.release()
 
 # Middleware to track page visits
 class VisitTrackingMiddleware(BaseHTTPMiddleware):
@@ -27,11 +139,7 @@ class VisitTrackingMiddleware(BaseHTTPMiddleware):
         
         # Log the visit after responding (fire and forget)
         if should_track:
-            # Extract IP address (handle proxies/load balancers)
-            ip = request.headers.get("X-Forwarded-For", request.client.host if request.client else "unknown")
-            # X-Forwarded-For can contain multiple IPs, take the first one
-            if ip and "," in ip:
-                ip = ip.split(",")[0].strip()
+            ip = get_client_ip(request)
             
             # Extract user agent
             user_agent = request.headers.get("User-Agent", "unknown")
@@ -54,73 +162,665 @@ class VisitTrackingMiddleware(BaseHTTPMiddleware):
         
         return response
 
+# Compression sits inside visit tracking so it sees whole response bodies
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(VisitTrackingMiddleware)
 
-# Initialize database on startup
+# Check the schema version on startup (migrations run as a pre-deploy step, and
+# start.sh applies them via scripts/migrate.py unless another process already is)
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables and indexes."""
+    """Verify the database is reachable and its schema is current."""
     try:
-        init_database()
-        print("✅ Database initialized successfully")
+        current, latest = check_schema()
+        if current < latest:
+            print(f"⚠️  Database schema is at version {current}, latest is {latest}: "
+                  f"run `python scripts/migrate.py`")
+        else:
+            print(f"✅ Database schema is up to date (version {current})")
     except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
+        if snapshot.is_available():
+            # Keep serving searches from the local snapshot until the database is back
+            print(f"⚠️  Database unavailable, starting in degraded mode: {e}")
+            return
+        print(f"❌ Database connection failed: {e}")
         raise
+    
+    # Make sure the local fallback snapshot and suggestion index match the
+    # current dataset (both built in background)
+    version = get_dataset_version()
+    snapshot.refresh_if_stale(version)
+    suggestions.refresh_if_stale(version)
+    spelling.refresh_if_stale(version)
+
+class ClientDisconnected(Exception):
+    """The client closed the connection while we were working."""
+
+async def await_unless_disconnected(request: Request, awaitable):
+    """
+    Await a coroutine, cancelling it if the client disconnects first.
+    
+    Raises:
+        ClientDisconnected: if the client went away before the result was ready
+    """
+    task = asyncio.ensure_future(awaitable)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            metrics.incr("search.client_disconnected")
+            raise ClientDisconnected()
+
+def run_search(q: str, top_k: int, speaker: str, deadline: SearchDeadline, mode: str = "fts",
+               facets: dict = None):
+    """
+    Run one search under a deadline, failing over to the local snapshot.
+    Substring and wildcard searches need PostgreSQL and never fail over.
+    A facets dict is filled in by full-text searches served from PostgreSQL.
+    
+    Returns:
+        (results, partial, degraded)
+    """
+    if mode != "fts":
+        results = search_substring(q, top_k=top_k, speaker_filter=speaker, deadline=deadline,
+                                   wildcard=mode == "wildcard")
+        return results, deadline.partial, False
+    # With no snapshot to fall back to, always try the database
+    if db_breaker.allow_request() or not snapshot.is_available():
+        try:
+            results = search_quotes(q, top_k=top_k, speaker_filter=speaker, deadline=deadline, facets=facets)
+            db_breaker.record_success()
+            return results, deadline.partial, False
+        except DATABASE_FAILURES as e:
+            # A client's own short budget running out is a 504, not a reason to fail over
+            if is_client_timeout(e, deadline):
+                raise
+            if is_breaker_failure(e, deadline):
+                db_breaker.record_failure()
+            if not snapshot.is_available():
+                raise
+            print(f"Search failed over to snapshot: {e}")
+        finally:
+            # A cancelled or otherwise failed trial says nothing about the database
+            db_breaker.release_trial()
+    
+    metrics.incr("search.degraded")
+    return snapshot.search_snapshot(q, top_k=top_k, speaker_filter=speaker), False, True
+
+def facet_fields(counts: Optional[dict]) -> dict:
+    """Response fields for facet counts filled in by search_quotes ({} if there are none)."""
+    if not counts:
+        return {}
+    fields = {
+        "count": counts["total"],
+        "facets": {name: counts[name] for name in ("speaker", "show", "series")},
+    }
+    if counts["estimated"]:
+        fields["count_estimated"] = True
+    return fields
+
+def run_search_with_spelling(q: str, top_k: int, speaker: str, deadline: SearchDeadline, autocorrect: bool,
+                             mode: str = "fts", facets: bool = False):
+    """
+    run_search, plus spelling help when there are few or no hits.
+    
+    With no hits and autocorrect on, the corrected query is searched instead
+    (budget permitting); otherwise it is only suggested.
+    
+    Returns:
+        (results, partial, degraded, extras) where extras is a dict to merge
+        into the response: "did_you_mean" or "corrected_query", and with facets
+        on, the match total as "count" plus "facets"
+    """
+    counts = {} if facets else None
+    results, partial, degraded = run_search(q, top_k, speaker, deadline, mode, counts)
+    extras = facet_fields(counts)
+    # Substring patterns match fragments, so "correcting" them would only mislead
+    if len(results) >= SPELLING_FEW_RESULTS or mode != "fts":
+        return results, partial, degraded, extras
+    corrected = spelling.suggest_correction(q)
+    if not corrected:
+        return results, partial, degraded, extras
+    if not results and autocorrect and deadline.allows_optional_stage():
+        corrected_counts = {} if facets else None
+        corrected_results, corrected_partial, corrected_degraded = run_search(
+            corrected, top_k, speaker, deadline, facets=corrected_counts)
+        if corrected_results:
+            metrics.incr("search.autocorrected")
+            return (corrected_results, corrected_partial, corrected_degraded,
+                    {**facet_fields(corrected_counts), "corrected_query": corrected})
+    metrics.incr("search.did_you_mean")
+    return results, partial, degraded, {**extras, "did_you_mean": corrected}
+
+def with_context(results, lines: int, deadline: SearchDeadline = None):
+    """
+    Copy results with their surrounding dialogue attached, fetched in one query.
+    
+    Returns:
+        (results, ok); on a database failure the results come back without context
+    """
+    try:
+        contexts = get_context([(r["episode_id"], r["timestamp_sec"], r["id"]) for r in results], lines, deadline)
+    except DATABASE_FAILURES as e:
+        print(f"Failed to fetch context: {e}")
+        return results, False
+    # Results may be shared with coalesced requests, so never modify them in place
+    return [{**r, "context": c} for r, c in zip(results, contexts)], True
+
+def search_flight_key(q: str, speaker: Optional[str], top_k: int, autocorrect: bool, mode: str,
+                      facets: bool, budget_ms: int) -> tuple:
+    """
+    Coalescing key for /api/search: requests with equal keys share one execution.
+    Results depend only on the parsed query (see query_key), and the leader's
+    deadline governs the shared search, so only equal budgets coalesce.
+    """
+    if mode == "fts":
+        key = query_key(q)
+    else:
+        # Substring patterns ignore query syntax; wildcards keep their * and ?
+        key = q.lower() if mode == "wildcard" else normalize_query(q)
+    return (key, speaker.lower() if speaker else None, top_k, autocorrect, mode, facets, budget_ms)
+
+def search_page_fingerprint(q: str, speaker: Optional[str]) -> str:
+    """Ties paginated-search cursors to one query (see query_key) and speaker."""
+    return query_fingerprint(query_key(q), speaker.lower() if speaker else None)
 
 @app.get("/api/search")
-def search(
+async def search(
     request: Request,
     q: str = Query(..., min_length=2),
     top_k: int = 5,
     speaker: str = None,
-    test: bool = Query(False, description="If true, skip logging this search")
+    test: bool = Query(False, description="If true, skip logging this search"),
+    profile: bool = Query(False, description="If true, return a profiling breakdown (requires test=true and X-Profile-Token)"),
+    profile_dump: str = Query(None, description="Also write a profile file: cprofile or pyinstrument"),
+    budget_ms: int = Query(None, gt=0, description="Time budget in milliseconds (capped by the server)"),
+    context: int = Query(0, ge=0, le=CONTEXT_MAX_LINES, description="Lines of surrounding dialogue per result"),
+    autocorrect: bool = Query(True, description="If no hits, search the spelling-corrected query instead"),
+    mode: str = Query("fts", description="fts, substring, or wildcard (* and ? patterns)"),
+    facets: bool = Query(False, description="If true, count matches per speaker, show and series and return the total as count "
+                                            "(otherwise count is the number of results returned)"),
+    _admitted: None = Depends(search_admission)
 ):
-    """Search quotes with PostgreSQL full-text search."""
+    """
+    Search quotes with PostgreSQL full-text search (or substring/wildcard matching).
+    count is the real (or, past FACET_MAX_ROWS, estimated) match total only with
+    facets=true: totalling every match costs a scan that plain top-k searches
+    avoid, so without facets it is the number of results returned.
+    """
+    # Profiling is only allowed on test searches so profiled runs are never logged
+    if profile and not test:
+        raise HTTPException(status_code=400, detail="profile=1 requires test=1")
+    # Profiles expose internal call stacks and write files, so they need the operator's token
+    if (profile or profile_dump) and not profiling_allowed(request.headers.get("X-Profile-Token")):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled for this client")
+    if profile_dump and profile_dump not in DUMP_FORMATS:
+        raise HTTPException(status_code=400, detail=f"profile_dump must be one of: {', '.join(DUMP_FORMATS)}")
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(SEARCH_MODES)}")
+    if mode != "fts":
+        try:
+            substring_pattern(q, wildcard=mode == "wildcard")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Results only change on re-import, so the dataset version keys the cache
+    version = await asyncio.to_thread(get_dataset_version) if not profile else None
+    # Derived data follows re-imports without a restart (rebuilt in background)
+    spelling.refresh_if_stale(version)
+    snapshot.refresh_if_stale(version)
+    if version:
+        etag = make_etag(version, "search", q, top_k, speaker, context, autocorrect, mode, facets)
+        headers = {"ETag": etag, "Cache-Control": cache_control(SEARCH_CACHE_MAX_AGE)}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        headers = {"Cache-Control": "no-store"}
+    
+    budget = min(budget_ms or SEARCH_TIME_BUDGET_MS, SEARCH_TIME_BUDGET_MS)
+    deadline = SearchDeadline(budget)
     try:
-        results = search_quotes(q, top_k=top_k, speaker_filter=speaker)
+        profiler = None
+        if profile:
+            profiler = SearchProfiler(dump_format=profile_dump)
+            results, partial, degraded, extras = await asyncio.to_thread(
+                profiler.run, run_search_with_spelling, q, top_k, speaker, deadline, autocorrect, mode, facets)
+        else:
+            # If every client waiting on this search disconnects, the backend query is cancelled.
+            flight_key = search_flight_key(q, speaker, top_k, autocorrect, mode, facets, budget)
+            results, partial, degraded, extras = await await_unless_disconnected(request, search_flight.do_async(
+                flight_key, run_search_with_spelling, q, top_k, speaker, deadline, autocorrect, mode, facets,
+                on_abandon=deadline.cancel
+            ))
         
-        # Log the search unless it's a test search
-        if not test:
-            # Extract IP address (handle proxies/load balancers)
-            ip = request.headers.get("X-Forwarded-For", request.client.host if request.client else "unknown")
-            # X-Forwarded-For can contain multiple IPs, take the first one
-            if ip and "," in ip:
-                ip = ip.split(",")[0].strip()
+        if context and results and not degraded:
+            results, context_ok = await asyncio.to_thread(with_context, results, context, deadline)
+            partial = partial or not context_ok
+        
+        # Log the search unless it's a test search (or the database is unavailable)
+        if not test and not degraded:
+            ip = get_client_ip(request)
             
             # Extract user agent
             user_agent = request.headers.get("User-Agent", "unknown")
             
-            log_search(q, top_k, ip, user_agent)
+            await asyncio.to_thread(log_search, q, top_k, ip, user_agent)
         
-        return {"query": q, "count": len(results), "results": results}
+        body = {"query": q, "count": len(results), "results": results, **extras}
+        if partial:
+            # Partial results (exact-match probe skipped) must not be cached
+            body["partial"] = True
+            headers = {"Cache-Control": "no-store"}
+        if version and mode == "fts" and len(results) < SPELLING_FEW_RESULTS and not spelling.is_current(version):
+            # Spelling help is missing or stale until the index is rebuilt for this version
+            headers = {"Cache-Control": "no-store"}
+        if degraded:
+            # Served from the local snapshot while PostgreSQL is unavailable
+            body["degraded"] = True
+            headers = {"Cache-Control": "no-store"}
+        if profiler:
+            body["profile"] = profiler.report()
+        # Returning the response directly skips FastAPI's jsonable_encoder pass
+        return FastJSONResponse(body, headers=headers)
+    except ClientDisconnected:
+        # Nobody is listening; 499 is the conventional "client closed request" status
+        return Response(status_code=499)
+    except SearchTimeout:
+        metrics.incr("search.timeouts")
+        raise HTTPException(status_code=504, detail="Search timed out, try a more specific query")
+    except SearchCancelled:
+        return Response(status_code=499)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+def load_page(q: str, speaker: str, version: str, deadline: SearchDeadline, after_key: Optional[tuple],
+              page_size: int):
+    """
+    The page after after_key, from keyset-ordered candidates cached per worker.
+    Candidates are ranked only as deep as this page needs (doubling each time
+    a page runs past them, up to SEARCH_PAGE_MAX_RESULTS), so early pages cost
+    about as much as a plain top-k search.
+    
+    Returns:
+        (page, has_more, partial, degraded)
+    """
+    key = (version, query_key(q), speaker.lower() if speaker else None)
+    cached = page_candidates.get(key) if version else None
+    if cached is not None:
+        metrics.incr("search.page_cache_hits")
+    candidates, depth, complete = cached or ([], 0, False)
+    partial = degraded = False
+    # One extra result tells whether there is a next page
+    while not complete and len(candidates) <= resume_index(candidates, after_key) + page_size:
+        depth = next_fetch_depth(depth, resume_index(candidates, after_key) + page_size + 1)
+        results, partial, degraded = run_search(q, depth, speaker, deadline)
+        candidates = sort_candidates(results)
+        complete = len(results) < depth or depth >= SEARCH_PAGE_MAX_RESULTS
+        if partial or degraded:
+            # Incomplete rankings must not be served to later pages
+            break
+        if version:
+            page_candidates.put(key, (candidates, depth, complete))
+    page, has_more = page_after(candidates, after_key, page_size)
+    return page, has_more, partial, degraded
+
+@app.get("/api/search/page")
+async def search_page(
+    request: Request,
+    q: str = Query(..., min_length=2),
+    speaker: str = None,
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    _admitted: None = Depends(search_admission)
+):
+    """Paginated search: each page carries an opaque cursor for the next one."""
+    fingerprint = search_page_fingerprint(q, speaker)
+    try:
+        after_key = decode_cursor(cursor, fingerprint) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    version = await asyncio.to_thread(get_dataset_version)
+    headers = {"Cache-Control": "no-store"}
+    if version:
+        etag = make_etag(version, "page", q, speaker, page_size, cursor)
+        headers = {"ETag": etag, "Cache-Control": cache_control(SEARCH_CACHE_MAX_AGE)}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+    
+    deadline = SearchDeadline(SEARCH_TIME_BUDGET_MS)
+    try:
+        page, has_more, partial, degraded = await await_unless_disconnected(
+            request, asyncio.to_thread(load_page, q, speaker, version, deadline, after_key, page_size))
+    except ClientDisconnected:
+        deadline.cancel()
+        return Response(status_code=499)
+    except SearchTimeout:
+        metrics.incr("search.timeouts")
+        raise HTTPException(status_code=504, detail="Search timed out, try a more specific query")
+    except SearchCancelled:
+        return Response(status_code=499)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    
+    body = {
+        "query": q,
+        "count": len(page),
+        "results": page,
+        "next_cursor": encode_cursor(fingerprint, page[-1]) if has_more else None,
+    }
+    if partial or degraded:
+        body["partial" if partial else "degraded"] = True
+        headers = {"Cache-Control": "no-store"}
+    return FastJSONResponse(body, headers=headers)
+
+class BatchSearchItem(BaseModel):
+    q: str = Field(..., min_length=2)
+    speaker: Optional[str] = None
+    top_k: int = Field(5, ge=1, le=SEARCH_BATCH_MAX_TOP_K)
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchSearchItem] = Field(..., min_length=1, max_length=SEARCH_BATCH_MAX_ITEMS)
+    test: bool = False
+    budget_ms: Optional[int] = Field(None, gt=0)
+
+def run_batch_search(items, deadline: SearchDeadline):
+    """
+    Run a batch of searches under one deadline, failing over to the local snapshot.
+    
+    Returns:
+        (results_per_item, partial, degraded)
+    """
+    if db_breaker.allow_request() or not snapshot.is_available():
+        try:
+            results = search_quotes_batch(items, deadline=deadline)
+            db_breaker.record_success()
+            return results, deadline.partial, False
+        except DATABASE_FAILURES as e:
+            if is_client_timeout(e, deadline):
+                raise
+            if is_breaker_failure(e, deadline):
+                db_breaker.record_failure()
+            if not snapshot.is_available():
+                raise
+            print(f"Batch search failed over to snapshot: {e}")
+        finally:
+            db_breaker.release_trial()
+    
+    metrics.incr("search.degraded")
+    results = [snapshot.search_snapshot(q, top_k=top_k, speaker_filter=speaker) for q, speaker, top_k in items]
+    return results, False, True
+
+@app.post("/api/search/batch")
+async def search_batch(request: Request, body: BatchSearchRequest):
+    """Run several searches in one request (and one database round trip), results in order."""
+    # Each item counts against the client's rate limit like a separate search
+    admit_search(request, cost=len(body.queries))
+    try:
+        items = [(item.q, item.speaker, item.top_k) for item in body.queries]
+        deadline = SearchDeadline(min(body.budget_ms or SEARCH_TIME_BUDGET_MS, SEARCH_TIME_BUDGET_MS))
+        metrics.incr("search.batch_items", len(items))
+        try:
+            results, partial, degraded = await await_unless_disconnected(
+                request, asyncio.to_thread(run_batch_search, items, deadline))
+        except ClientDisconnected:
+            # The worker thread can't be interrupted, but its query can
+            deadline.cancel()
+            return Response(status_code=499)
+        
+        if not body.test and not degraded:
+            ip = get_client_ip(request)
+            user_agent = request.headers.get("User-Agent", "unknown")
+            await asyncio.to_thread(log_searches, [(q, top_k) for q, _, top_k in items], ip, user_agent)
+        
+        response_body = {
+            "count": len(items),
+            "results": [
+                {"query": q, "speaker": speaker, "count": len(item_results), "results": item_results}
+                for (q, speaker, _), item_results in zip(items, results)
+            ],
+        }
+        if partial:
+            response_body["partial"] = True
+        if degraded:
+            response_body["degraded"] = True
+        return FastJSONResponse(response_body, headers={"Cache-Control": "no-store"})
+    except SearchTimeout:
+        metrics.incr("search.timeouts")
+        raise HTTPException(status_code=504, detail="Batch search timed out, try fewer or more specific queries")
+    except SearchCancelled:
+        return Response(status_code=499)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+    finally:
+        search_concurrency.release()
+
+@app.get("/api/search/export")
+async def search_export(
+    request: Request,
+    q: str = Query(..., min_length=2),
+    speaker: str = None,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    phrase: bool = Query(False, description="If true, only quotes containing the exact phrase"),
+    limit: int = Query(EXPORT_MAX_ROWS, gt=0, le=EXPORT_MAX_ROWS),
+):
+    """Stream every matching quote, ordered by episode and timestamp, as NDJSON or CSV."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    admit_search(request, limiter=export_concurrency)
+    
+    def stream():
+        try:
+            rows = iter_matches(q, speaker_filter=speaker, phrase=phrase, limit=limit,
+                                fetch_size=EXPORT_FETCH_SIZE, statement_timeout_ms=SEARCH_TIME_BUDGET_MS)
+            yield from encode_rows(rows, format)
+        finally:
+            export_concurrency.release()
+    
+    chunks = stream()
+    try:
+        # Run the query before sending headers so failures still get a proper status
+        first = await asyncio.to_thread(next, chunks, b"")
+    except Exception as e:
+        chunks.close()
+        if isinstance(e, DATABASE_FAILURES):
+            if is_breaker_failure(e):
+                db_breaker.record_failure()
+            raise HTTPException(status_code=503, detail="Export is unavailable right now, try again later")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    
+    async def body():
+        try:
+            yield first
+            # Sync generator steps run in a worker thread so fetches don't block the event loop
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Client went away mid-stream: return the connection and export slot now
+            try:
+                chunks.close()
+            except ValueError:
+                pass  # A fetch is still running in its thread; the generator closes when collected
+    
+    metrics.incr("search.exports")
+    headers = {"Cache-Control": "no-store"}
+    if format == "csv":
+        headers["Content-Disposition"] = 'attachment; filename="quotes-export.csv"'
+    return StreamingResponse(body(), media_type=EXPORT_FORMATS[format], headers=headers)
+
+@app.get("/api/context")
+def context_lines(
+    request: Request,
+    anchor: List[str] = Query(..., description="episode_id@timestamp_sec, repeatable"),
+    lines: int = Query(2, ge=1, le=CONTEXT_MAX_LINES),
+):
+    """Surrounding dialogue for many transcript lines at once."""
+    if len(anchor) > CONTEXT_MAX_ANCHORS:
+        raise HTTPException(status_code=400, detail=f"At most {CONTEXT_MAX_ANCHORS} anchors per request")
+    anchors = []
+    for value in anchor:
+        episode_id, _, timestamp = value.rpartition("@")
+        if not episode_id or not timestamp.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid anchor '{value}', expected episode_id@timestamp_sec")
+        anchors.append((episode_id, int(timestamp)))
+    
+    version = get_dataset_version()
+    headers = {"Cache-Control": "no-store"}
+    if version:
+        etag = make_etag(version, "context", lines, *anchor)
+        headers = {"ETag": etag, "Cache-Control": cache_control(STATS_CACHE_MAX_AGE)}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+    
+    try:
+        contexts = get_context(anchors, lines, SearchDeadline(SEARCH_TIME_BUDGET_MS))
+    except DATABASE_FAILURES:
+        raise HTTPException(status_code=503, detail="Context is unavailable right now, try again later")
+    body = {
+        "count": len(anchors),
+        "results": [
+            {"episode_id": episode_id, "timestamp_sec": timestamp_sec, **c}
+            for (episode_id, timestamp_sec), c in zip(anchors, contexts)
+        ],
+    }
+    return FastJSONResponse(body, headers=headers)
+
+@app.get("/api/episodes/{episode_id}/transcript")
+def episode_transcript(
+    request: Request,
+    episode_id: str,
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    at: int = Query(None, ge=0, description="Jump to the first line at or after this many seconds"),
+    speaker: str = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Read an episode's transcript in order, keyset-paginated by (timestamp_sec, id)."""
+    speaker = speaker.lower() if speaker else None
+    after = None
+    if cursor:
+        try:
+            payload = decode_token(cursor)
+            if payload.get("e") != episode_id or payload.get("s") != speaker:
+                raise InvalidCursor("Cursor does not belong to this transcript")
+            after = (int(payload["t"]), int(payload["i"]))
+        except (InvalidCursor, KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e) if isinstance(e, InvalidCursor) else "Malformed cursor")
+    
+    version = get_dataset_version()
+    headers = {"Cache-Control": "no-store"}
+    if version:
+        etag = make_etag(version, "transcript", episode_id, cursor, at, speaker, limit)
+        headers = {"ETag": etag, "Cache-Control": cache_control(STATS_CACHE_MAX_AGE)}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+    
+    try:
+        page = get_transcript_page(episode_id, after=after, from_timestamp=at, speaker_filter=speaker, limit=limit)
+        if not page["lines"] and after is None and not episode_exists(episode_id):
+            raise HTTPException(status_code=404, detail="Episode not found")
+    except DATABASE_FAILURES:
+        raise HTTPException(status_code=503, detail="Transcripts are unavailable right now, try again later")
+    
+    lines = page["lines"]
+    next_cursor = None
+    if page["has_more"]:
+        last = lines[-1]
+        next_cursor = encode_token({"e": episode_id, "s": speaker, "t": last["timestamp_sec"], "i": last["id"]})
+    body = {
+        "episode_id": episode_id,
+        "episode_name": page["episode_name"],
+        "spotify_url": page["spotify_url"],
+        "count": len(lines),
+        "lines": lines,
+        "next_cursor": next_cursor,
+    }
+    return FastJSONResponse(body, headers=headers)
+
+@app.get("/api/suggest")
+def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=suggestions.SUGGEST_MAX_RESULTS),
+):
+    """Search-as-you-type completions from the in-memory prefix index."""
+    # Picks up re-imports; the version is cached so this rarely costs a query
+    version = get_dataset_version()
+    suggestions.refresh_if_stale(version)
+    body = {"query": q, "suggestions": suggestions.suggest(q, limit)}
+    # While the index is (re)building, answers are empty or stale and must not be cached
+    cache = cache_control(SEARCH_CACHE_MAX_AGE) if suggestions.is_current(version) else "no-store"
+    return FastJSONResponse(body, headers={"Cache-Control": cache})
+
 @app.get("/api/health")
 def health():
     """Health check endpoint."""
     return {"status": "healthy", "message": "XFM Quote Finder API"}
 
+@app.get("/api/metrics")
+def get_metrics():
+    """Operational counters for this worker process."""
+    return {
+        "counters": metrics.snapshot(),
+        "search_in_flight": search_flight.in_flight(),
+        "database_breaker": db_breaker.state,
+        "read_engines": read_engines_health(),
+    }
+
 @app.get("/api/stats")
-def stats():
+def stats(request: Request, response: Response):
     """Get database statistics."""
+    version = get_dataset_version()
+    if version:
+        etag = make_etag(version, "stats")
+        headers = {"ETag": etag, "Cache-Control": cache_control(STATS_CACHE_MAX_AGE)}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+    
+    def degraded_stats():
+        # Snapshot answers must not be cached as if they came from the database
+        response.headers["Cache-Control"] = "no-store"
+        if "ETag" in response.headers:
+            del response.headers["ETag"]
+        return {**snapshot.snapshot_stats(), "degraded": True}
+    
     try:
-        return get_stats()
+        if not db_breaker.allow_request() and snapshot.is_available():
+            return degraded_stats()
+        stats = get_stats()
+        db_breaker.record_success()
+        return stats
+    except DATABASE_FAILURES as e:
+        if is_breaker_failure(e):
+            db_breaker.record_failure()
+        if snapshot.is_available():
+            return degraded_stats()
+        raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
+    finally:
+        db_breaker.release_trial()
 
-# Mount static files for the React frontend (after API routes)
-if os.path.exists("dist"):
-    app.mount("/", StaticFiles(directory="dist", html=True), name="static")
+# Mount static files for the React frontend (after API routes).
+# index.html is read once here; assets are served precompressed and immutable.
+static_files = SPAStaticFiles(directory="dist") if os.path.exists("dist") else None
+if static_files:
+    app.mount("/", static_files, name="static")
 
 # Serve index.html for all non-API routes (for SPA routing)
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
+async def serve_spa(request: Request, full_path: str):
     if full_path.startswith("api/"):
         raise HTTPException(status_code=404, detail="API endpoint not found")
     
     # Serve index.html for all other routes (SPA routing)
-    if os.path.exists("dist/index.html"):
-        return FileResponse("dist/index.html")
+    if static_files and static_files.index:
+        return static_files.index.response(request.headers)
     else:
         return {"message": "Frontend not built. Run 'npm run build' first."}
@@ -0,0 +1,25 @@
+"""
+In-process counters for operational metrics.
+Exposed as JSON at /api/metrics; counts are per worker process.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+
+def incr(name: str, value: int = 1):
+    """Increment a named counter."""
+    with _lock:
+        _counters[name] += value
+
+def snapshot() -> Dict[str, int]:
+    """Return a copy of all counters, sorted by name."""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+def reset():
+    """Clear all counters (used by tests)."""
+    with _lock:
+        _counters.clear()
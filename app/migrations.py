@@ -0,0 +1,226 @@
+"""
+Versioned schema migrations.
+Each migration runs once and is recorded in schema_migrations, so app startup
+is a single version check. Index builds on live tables run CONCURRENTLY from
+scripts/migrate.py and never block production writes.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from app.database import get_engine
+
+# Arbitrary key for pg_advisory_lock so only one migrator runs at a time
+MIGRATION_LOCK_ID = 727_001
+
+@dataclass
+class Migration:
+    """
+    A schema change: transactional statements plus concurrent index builds.
+    Statements must be idempotent (IF NOT EXISTS) so a migration interrupted
+    during its index builds can be re-run.
+    """
+    version: int
+    description: str
+    statements: List[str] = field(default_factory=list)
+    # (index_name, CREATE INDEX CONCURRENTLY IF NOT EXISTS ...) pairs, run outside a transaction
+    concurrent_indexes: List[Tuple[str, str]] = field(default_factory=list)
+    # Optional extensions the indexes need; if one isn't available on the server
+    # the indexes are skipped with a warning and the queries fall back to scans
+    extensions: List[str] = field(default_factory=list)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "initial schema", statements=[
+        """
+        CREATE TABLE IF NOT EXISTS quotes (
+            id SERIAL PRIMARY KEY,
+            episode_id VARCHAR(50) NOT NULL,
+            timestamp_sec INTEGER NOT NULL,
+            speaker VARCHAR(200) NOT NULL,
+            text TEXT NOT NULL,
+            episode_name TEXT,
+            spotify_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_quotes_speaker ON quotes(speaker)",
+        "CREATE INDEX IF NOT EXISTS idx_quotes_episode_timestamp ON quotes(episode_id, timestamp_sec)",
+        # PostgreSQL full-text search index
+        "CREATE INDEX IF NOT EXISTS idx_quotes_text_gin ON quotes USING gin(to_tsvector('english', text))",
+        """
+        CREATE TABLE IF NOT EXISTS search_log (
+            id SERIAL PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            query TEXT NOT NULL,
+            topk INTEGER NOT NULL,
+            ip VARCHAR(45),
+            user_agent TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_search_log_ts ON search_log(ts)",
+        """
+        CREATE TABLE IF NOT EXISTS visitors (
+            id SERIAL PRIMARY KEY,
+            ip VARCHAR(45) NOT NULL,
+            user_agent TEXT,
+            path VARCHAR(500),
+            visited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_visitors_ip ON visitors(ip)",
+        "CREATE INDEX IF NOT EXISTS idx_visitors_visited_at ON visitors(visited_at)",
+    ]),
+    Migration(2, "dataset metadata", statements=[
+        """
+        CREATE TABLE IF NOT EXISTS dataset_meta (
+            key VARCHAR(50) PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    Migration(3, "transcript keyset index", concurrent_indexes=[
+        # Covers (episode_id, timestamp_sec, id) keyset seeks for transcript pages
+        ("idx_quotes_episode_timestamp_id",
+         "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_episode_timestamp_id "
+         "ON quotes(episode_id, timestamp_sec, id)"),
+    ]),
+    Migration(4, "spelling vocabulary", statements=[
+        # Corpus word frequencies, refreshed by the importer (see app/spelling.py)
+        """
+        CREATE TABLE IF NOT EXISTS vocabulary (
+            word TEXT PRIMARY KEY,
+            frequency INTEGER NOT NULL
+        )
+        """,
+    ]),
+    Migration(5, "trigram substring index", extensions=["pg_trgm"], concurrent_indexes=[
+        # Substring/wildcard search (mode=substring) over the same normalized text
+        # the exact-match probe compares against
+        ("idx_quotes_normalized_text_trgm",
+         "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_normalized_text_trgm ON quotes "
+         r"USING gin ((TRIM(REGEXP_REPLACE(REGEXP_REPLACE(LOWER(text), '[^a-z0-9 ]', ' ', 'g'), '\s+', ' ', 'g'))) gin_trgm_ops)"),
+    ]),
+    Migration(6, "simple-config full-text index", concurrent_indexes=[
+        # Serves stop-word-heavy queries the 'english' configuration empties (see fts_config)
+        ("idx_quotes_text_simple_gin",
+         "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_quotes_text_simple_gin "
+         "ON quotes USING gin(to_tsvector('simple', text))"),
+    ]),
+    Migration(7, "term postings", statements=[
+        # Best-ranked quote ids for frequent lexemes, refreshed by the importer (see app/postings.py)
+        """
+        CREATE TABLE IF NOT EXISTS term_postings (
+            lexeme TEXT NOT NULL,
+            speaker TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            quote_id INTEGER NOT NULL,
+            word_rank REAL NOT NULL,
+            PRIMARY KEY (lexeme, speaker, position)
+        )
+        """,
+    ]),
+    Migration(8, "bm25 corpus statistics", statements=[
+        # Per-lexeme document frequencies and corpus size, refreshed by the importer (see app/bm25.py)
+        """
+        CREATE TABLE IF NOT EXISTS term_stats (
+            lexeme TEXT PRIMARY KEY,
+            ndoc INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS corpus_stats (
+            doc_count INTEGER NOT NULL,
+            avg_length REAL NOT NULL
+        )
+        """,
+    ]),
+]
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
+
+def _current_version(conn) -> int:
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+def check_schema() -> Tuple[int, int]:
+    """Return (current, latest) schema versions with a single query."""
+    with get_engine().connect() as conn:
+        try:
+            return _current_version(conn), LATEST_VERSION
+        except ProgrammingError:
+            # No schema_migrations table: the database predates migrations
+            return 0, LATEST_VERSION
+
+def _build_index_concurrently(conn, index_name: str, sql: str):
+    # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would skip
+    invalid = conn.execute(text("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": index_name}).fetchone()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+    conn.execute(text(sql))
+
+def _create_extensions(conn, extensions: List[str]) -> bool:
+    """Create each extension if the server ships it; False if any is unavailable."""
+    for name in extensions:
+        available = conn.execute(text(
+            "SELECT 1 FROM pg_available_extensions WHERE name = :name"
+        ), {"name": name}).fetchone()
+        if not available:
+            print(f"⚠️  PostgreSQL extension {name} is not available; skipping its indexes "
+                  f"(queries that need it will use sequential scans)")
+            return False
+        conn.execute(text(f'CREATE EXTENSION IF NOT EXISTS "{name}"'))
+    return True
+
+def apply_migrations(verbose: bool = True, wait: bool = True) -> Optional[int]:
+    """
+    Apply all pending migrations in order.
+
+    With wait=False, nothing is done if another process is already migrating.
+
+    Returns:
+        The schema version after migrating, or None if skipped
+    """
+    engine = get_engine()
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so this
+    # connection autocommits; it also holds the advisory lock for the whole run
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if wait:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        elif not conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}).scalar():
+            return None
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+            version = _current_version(conn)
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                if verbose:
+                    print(f"⏳ Applying migration {migration.version}: {migration.description}")
+                with engine.begin() as tx:
+                    for statement in migration.statements:
+                        tx.execute(text(statement))
+                indexes = migration.concurrent_indexes
+                if not _create_extensions(conn, migration.extensions):
+                    indexes = []
+                for index_name, sql in indexes:
+                    if verbose:
+                        print(f"   Building index {index_name} concurrently...")
+                    _build_index_concurrently(conn, index_name, sql)
+                # Recorded last: an interrupted migration is simply re-run
+                conn.execute(text("""
+                    INSERT INTO schema_migrations (version, description) VALUES (:version, :description)
+                """), {"version": migration.version, "description": migration.description})
+                version = migration.version
+            return version
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
@@ -0,0 +1,86 @@
+"""
+Precomputed top-k postings for the corpus's most frequent terms.
+A single common word ("karl", "monkey", "head") matches thousands of quotes,
+and ranking them live means ts_rank_cd over every match just to return a few.
+The importer stores the best-ranked quote ids for each frequent lexeme (overall
+and per speaker) in term_postings, so those searches become an index lookup.
+"""
+import os
+import time
+from typing import Optional
+
+# Lexemes in at least this many quotes get precomputed postings
+POSTINGS_MIN_DOCS = int(os.getenv("POSTINGS_MIN_DOCS", "500"))
+# Most lexemes precomputed (most frequent first)
+POSTINGS_MAX_TERMS = int(os.getenv("POSTINGS_MAX_TERMS", "500"))
+# Ranked quote ids kept per (lexeme, speaker); deeper requests are ranked live
+POSTINGS_DEPTH = int(os.getenv("POSTINGS_DEPTH", "100"))
+# Seconds between checks for term_postings while migration 7 hasn't created it
+POSTINGS_TABLE_RECHECK = 60
+
+# Monotonic time of the last check that found term_postings missing
+_missing_since: Optional[float] = None
+_table_exists = False
+
+# Ranked exactly like the single-word path of search_quotes: a one-word
+# plainto_tsquery is the lexeme itself, and ties break on timestamp_sec then id.
+# speaker '' holds the unfiltered ranking.
+REFRESH_POSTINGS_SQL = """
+    INSERT INTO term_postings (lexeme, speaker, position, quote_id, word_rank)
+    SELECT lexeme, speaker, position, quote_id, word_rank
+    FROM (
+        SELECT terms.word AS lexeme, s.speaker, q.id AS quote_id, r.word_rank,
+               ROW_NUMBER() OVER (
+                   PARTITION BY terms.word, s.speaker
+                   ORDER BY r.word_rank DESC, q.timestamp_sec ASC, q.id ASC
+               ) AS position
+        FROM (
+            SELECT word
+            FROM ts_stat('SELECT to_tsvector(''english'', text) FROM quotes')
+            WHERE ndoc >= :min_docs
+            ORDER BY ndoc DESC, word
+            LIMIT :max_terms
+        ) terms
+        JOIN quotes q ON to_tsvector('english', q.text) @@ quote_literal(terms.word)::tsquery
+        CROSS JOIN LATERAL (
+            SELECT ts_rank_cd(to_tsvector('english', q.text), quote_literal(terms.word)::tsquery, 32) AS word_rank
+        ) r
+        CROSS JOIN LATERAL (VALUES (''), (q.speaker)) AS s(speaker)
+    ) ranked
+    WHERE position <= :depth
+"""
+
+def refresh_postings(conn) -> int:
+    """
+    Recompute term_postings from the quotes corpus (run by the importer).
+
+    Returns:
+        Number of postings stored
+    """
+    from sqlalchemy import text
+
+    conn.execute(text("DELETE FROM term_postings"))
+    result = conn.execute(text(REFRESH_POSTINGS_SQL), {
+        "min_docs": POSTINGS_MIN_DOCS, "max_terms": POSTINGS_MAX_TERMS, "depth": POSTINGS_DEPTH,
+    })
+    return result.rowcount
+
+def postings_available() -> bool:
+    """
+    True once term_postings exists. Searches fall back to live ranking until then,
+    since the app may start before migrations have run; a missing table is
+    rechecked every POSTINGS_TABLE_RECHECK seconds.
+    """
+    global _missing_since, _table_exists
+    if _table_exists:
+        return True
+    now = time.monotonic()
+    if _missing_since is not None and now - _missing_since < POSTINGS_TABLE_RECHECK:
+        return False
+    from sqlalchemy import text
+    from app.database import get_read_connection
+
+    with get_read_connection() as conn:
+        _table_exists = conn.execute(text("SELECT to_regclass('term_postings') IS NOT NULL")).scalar()
+    _missing_since = None if _table_exists else now
+    return _table_exists
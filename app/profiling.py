@@ -0,0 +1,137 @@
+"""
+Per-request profiling for search queries.
+Collects stage timings and the hottest functions for a single search,
+optionally dumping a cProfile or pyinstrument file for offline analysis.
+cProfile/pstats are imported on first use, since search_core imports this
+module on every code path.
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# Where profile dumps are written
+PROFILE_DIR = os.getenv("PROFILE_DIR", "out/profiles")
+# Secret required (X-Profile-Token header) to profile API searches; unset disables profiling
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+DUMP_FORMATS = ("cprofile", "pyinstrument")
+
+_active_profiler: ContextVar[Optional["SearchProfiler"]] = ContextVar("active_profiler", default=None)
+
+def profiling_allowed(token: Optional[str]) -> bool:
+    """True if token matches PROFILE_TOKEN (always False when no token is configured)."""
+    return bool(PROFILE_TOKEN) and hmac.compare_digest((token or "").encode(), PROFILE_TOKEN.encode())
+
+@contextmanager
+def stage(name: str):
+    """Time a named stage of the current search (no-op unless profiling)."""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.stages.append((name, (time.perf_counter() - start) * 1000))
+
+class SearchProfiler:
+    """Runs a single call under a profiler and reports where the time went."""
+
+    def __init__(self, top_n: int = 15, dump_format: Optional[str] = None):
+        if dump_format and dump_format not in DUMP_FORMATS:
+            raise ValueError(f"dump_format must be one of: {', '.join(DUMP_FORMATS)}")
+        self.top_n = top_n
+        self.dump_format = dump_format
+        self.stages: List[tuple] = []
+        self.total_ms = 0.0
+        self.dump_path: Optional[str] = None
+        self._stats = None  # pstats.Stats after a cProfile run
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Call fn(*args, **kwargs) under the profiler and return its result."""
+        token = _active_profiler.set(self)
+        start = time.perf_counter()
+        try:
+            if self.dump_format == "pyinstrument":
+                return self._run_pyinstrument(fn, *args, **kwargs)
+            return self._run_cprofile(fn, *args, **kwargs)
+        finally:
+            self.total_ms = (time.perf_counter() - start) * 1000
+            _active_profiler.reset(token)
+
+    def _run_cprofile(self, fn: Callable, *args, **kwargs) -> Any:
+        import cProfile
+        import io
+        import pstats
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            self._stats = pstats.Stats(profile, stream=io.StringIO())
+            if self.dump_format == "cprofile":
+                self.dump_path = self._dump_path("prof")
+                self._stats.dump_stats(self.dump_path)
+
+    def _run_pyinstrument(self, fn: Callable, *args, **kwargs) -> Any:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError("pyinstrument is not installed (pip install pyinstrument)")
+
+        # pyinstrument and cProfile both install the interpreter profile hook,
+        # so only one of them can run; top_functions stays empty in this mode
+        profiler = Profiler()
+        profiler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.stop()
+            self.dump_path = self._dump_path("html")
+            with open(self.dump_path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+
+    def _dump_path(self, extension: str) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"search-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{extension}"
+        return os.path.join(PROFILE_DIR, filename)
+
+    def top_functions(self) -> List[Dict[str, Any]]:
+        """Return the most expensive functions by cumulative time."""
+        if self._stats is None:
+            return []
+        rows = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in self._stats.stats.items():
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})",
+                "calls": ncalls,
+                "self_ms": round(tottime * 1000, 3),
+                "cumulative_ms": round(cumtime * 1000, 3),
+            })
+        rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+        return rows[:self.top_n]
+
+    def report(self) -> Dict[str, Any]:
+        """Stage breakdown, top functions and dump location as a dict."""
+        return {
+            "total_ms": round(self.total_ms, 3),
+            "stages": [{"name": name, "ms": round(ms, 3)} for name, ms in self.stages],
+            "top_functions": self.top_functions(),
+            "dump_path": self.dump_path,
+        }
+
+def print_report(report: Dict[str, Any]):
+    """Pretty-print a profiling report to the terminal."""
+    print(f"⏱️  Total: {report['total_ms']:.2f} ms")
+    for s in report["stages"]:
+        print(f"   {s['name']:<20} {s['ms']:>10.2f} ms")
+    if report["top_functions"]:
+        print(f"\n{'Cumulative ms':>14} {'Self ms':>10} {'Calls':>7}  Function")
+        for f in report["top_functions"]:
+            print(f"{f['cumulative_ms']:>14.2f} {f['self_ms']:>10.2f} {f['calls']:>7}  {f['function']}")
+    if report["dump_path"]:
+        print(f"\n💾 Profile written to {report['dump_path']}")
@@ -0,0 +1,104 @@
+"""
+Search query syntax: "quoted phrases", -exclusions, OR, and speaker:/episode:
+field prefixes. A query is parsed once into text for websearch_to_tsquery
+plus structured filters, so search_quotes answers it with one index-served
+statement.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Plain queries longer than this many words match on a share of their words
+# instead of requiring every one (minimum-should-match)
+MIN_SHOULD_MATCH_WORDS = 4
+# Share of a long query's words a quote must contain
+MIN_SHOULD_MATCH_RATIO = float(os.getenv("MIN_SHOULD_MATCH_RATIO", "0.75"))
+# Most candidate quotes (matching any of a long query's words) checked against the ratio,
+# lowest ids first; results are flagged partial when more candidates were left unchecked
+MIN_SHOULD_MATCH_MAX_CANDIDATES = int(os.getenv("MIN_SHOULD_MATCH_MAX_CANDIDATES", "2000"))
+
+FIELDS = ("speaker", "episode")
+
+# Optional minus, optional field prefix, then a "quoted phrase" (closing quote
+# optional while typing) or a bare word
+TOKEN_RE = re.compile(r'(-?)(?:(speaker|episode):)?(?:"([^"]*)"?|(\S+))', re.IGNORECASE)
+
+@dataclass
+class ParsedQuery:
+    """A search query split into full-text terms and field filters."""
+    # Positive words and phrases, for ranking and phrase boosts
+    text: str = ""
+    # Normalized input for websearch_to_tsquery (phrases, -exclusions, or)
+    websearch: str = ""
+    speaker: Optional[str] = None
+    episode: Optional[str] = None
+    excluded_speakers: List[str] = field(default_factory=list)
+    excluded_episodes: List[str] = field(default_factory=list)
+    # True if the query uses syntax plain FTS can't express (phrases, exclusions, OR, episode filters)
+    structured: bool = False
+
+def _normalize(value: str) -> str:
+    # Same normalization as search_core.normalize_query (imported lazily there)
+    return " ".join(re.sub(r"[^\w\s]", " ", value.lower()).split())
+
+def parse_query(query: str) -> ParsedQuery:
+    """Parse query syntax; queries without any parse to their own text."""
+    parsed = ParsedQuery()
+    positive, websearch = [], []
+    for match in TOKEN_RE.finditer(query):
+        negated, field_name, phrase, word = match.groups()
+        value = phrase if phrase is not None else word
+        if field_name:
+            field_name = field_name.lower()
+            value = value.strip().lower()
+            if not value:
+                continue
+            if negated:
+                getattr(parsed, f"excluded_{field_name}s").append(value)
+            else:
+                setattr(parsed, field_name, value)
+            parsed.structured = parsed.structured or field_name == "episode" or bool(negated)
+            continue
+        if phrase is None and word == "OR" and not negated:
+            # Dangling ORs (first, last or doubled) are ignored by websearch_to_tsquery
+            websearch.append("or")
+            parsed.structured = True
+            continue
+        normalized = _normalize(value)
+        if not normalized:
+            continue
+        quoted = phrase is not None or (negated and " " in normalized)
+        if quoted:
+            term = f'"{normalized}"'
+        else:
+            # websearch_to_tsquery reads a bare "or" as OR in any case; only OR is syntax here
+            term = " ".join('"or"' if w == "or" else w for w in normalized.split())
+        if negated:
+            websearch.append(f"-{term}")
+            parsed.structured = True
+        else:
+            websearch.append(term)
+            positive.append(value.strip())
+        if phrase is not None:
+            parsed.structured = True
+    parsed.text = " ".join(positive)
+    parsed.websearch = " ".join(websearch)
+    return parsed
+
+def query_key(query: str) -> str:
+    """
+    Canonical form of a query for cache, coalescing and cursor keys: queries with
+    equal keys get identical results. Plain queries reduce to their normalized
+    text; syntax (phrases, exclusions, OR) and field filters stay distinct.
+    """
+    parsed = parse_query(query)
+    parts = [
+        _normalize(parsed.text),
+        parsed.websearch if parsed.structured else "",
+        parsed.speaker or "",
+        parsed.episode or "",
+        ",".join(sorted(parsed.excluded_speakers)),
+        ",".join(sorted(parsed.excluded_episodes)),
+    ]
+    return "\x1f".join(parts)
@@ -0,0 +1,25 @@
+"""
+Fast JSON responses.
+Uses orjson when installed and falls back to a compact stdlib encoder, so
+endpoints can return plain dicts/lists without going through jsonable_encoder.
+"""
+import json
+from typing import Any
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson (or compact json as a fallback)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -2,10 +2,90 @@
 PostgreSQL-based search with full-text search optimization.
 Optimized for production with proper indexing and query performance.
 """
+import math
+import os
 import re
-from typing import List, Dict, Any
+from typing import List, TypedDict
 from sqlalchemy import text
-from app.database import get_connection
+from sqlalchemy.exc import DBAPIError
+from app.database import get_connection, get_read_connection
+from app.profiling import stage
+from app.deadlines import SearchDeadline, SearchTimeout, SearchCancelled, translate_cancellation
+from app.postings import POSTINGS_DEPTH, postings_available
+from app.bm25 import SEARCH_RANKER, bm25_search_sql
+from app.query_syntax import (
+    ParsedQuery, parse_query, MIN_SHOULD_MATCH_WORDS, MIN_SHOULD_MATCH_RATIO, MIN_SHOULD_MATCH_MAX_CANDIDATES,
+)
+
+# Most rows a substring/wildcard search ranks (shortest matching quotes first)
+SUBSTRING_MAX_CANDIDATES = int(os.getenv("SUBSTRING_MAX_CANDIDATES", "200"))
+# Most matching rows a substring/wildcard search reads before picking the shortest
+SUBSTRING_MAX_SCAN = int(os.getenv("SUBSTRING_MAX_SCAN", "2000"))
+# Most matching rows counted for facets; beyond this the counts are lower bounds
+FACET_MAX_ROWS = int(os.getenv("FACET_MAX_ROWS", "10000"))
+# Substring patterns need a literal run this long to use the trigram index
+SUBSTRING_MIN_LITERAL = 3
+
+# Quote text normalized the way normalize_query does it (ASCII only); indexed by
+# idx_quotes_normalized_text_trgm, so queries must use this exact expression
+NORMALIZED_TEXT_SQL = r"TRIM(REGEXP_REPLACE(REGEXP_REPLACE(LOWER(text), '[^a-z0-9 ]', ' ', 'g'), '\s+', ' ', 'g'))"
+
+# Multi-word queries keeping less than this share of their words (or at most one)
+# under the 'english' configuration are searched with 'simple' instead
+SIMPLE_FTS_MAX_KEPT_RATIO = float(os.getenv("SIMPLE_FTS_MAX_KEPT_RATIO", "0.5"))
+
+# PostgreSQL's english.stop list: words the 'english' configuration discards
+ENGLISH_STOPWORDS = frozenset("""
+    i me my myself we our ours ourselves you your yours yourself yourselves he him his
+    himself she her hers herself it its itself they them their theirs themselves what
+    which who whom this that these those am is are was were be been being have has had
+    having do does did doing a an the and but if or because as until while of at by for
+    with about against between into through during before after above below to from up
+    down in out on off over under again further then once here there when where why how
+    all any both each few more most other some such no nor not only own same so than too
+    very s t can will just don should now
+""".split())
+
+# A single-word query: the best matches come from term_postings when the word is
+# frequent enough to have been precomputed (hits), otherwise from live ranking,
+# which only runs when there are no hits. Both branches order rows identically.
+SINGLE_TERM_SQL = """
+    WITH hits AS MATERIALIZED (
+        SELECT q.id, q.episode_id, q.timestamp_sec, q.speaker, q.text,
+               q.episode_name, q.spotify_url, 0.0 AS phrase_rank, p.word_rank
+        FROM term_postings p
+        JOIN quotes q ON q.id = p.quote_id
+        WHERE p.lexeme = ANY(tsvector_to_array(to_tsvector('english', :query)))
+          AND length(to_tsvector('english', :query)) = 1
+          AND p.speaker = :speaker_key
+        ORDER BY p.position
+        LIMIT :limit
+    )
+    SELECT * FROM hits
+    UNION ALL
+    (SELECT id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url,
+            0.0 AS phrase_rank,
+            ts_rank_cd(to_tsvector('english', text), plainto_tsquery('english', :query), 32) AS word_rank
+     FROM quotes
+     WHERE NOT EXISTS (SELECT 1 FROM hits)
+       AND to_tsvector('english', text) @@ plainto_tsquery('english', :query)
+       {speaker_condition}
+     ORDER BY word_rank DESC, timestamp_sec ASC
+     LIMIT :limit)
+    ORDER BY word_rank DESC, timestamp_sec ASC, id
+"""
+
+class SearchResult(TypedDict):
+    """A single search hit as returned by the API (JSON-native types only)."""
+    id: int
+    episode_id: str
+    episode_name: str
+    timestamp_sec: int
+    timestamp_hms: str
+    speaker: str
+    text: str
+    spotify_url: str
+    rank: float
 
 def fmt_time(sec: int) -> str:
     """Format seconds as HH:MM:SS."""
@@ -19,6 +99,18 @@ def normalize_query(query: str) -> str:
     normalized = ' '.join(normalized.split())  # Remove extra spaces
     return normalized
 
+def fts_config(normalized_query: str) -> str:
+    """
+    Text search configuration for a query: 'simple' when 'english' would drop
+    most of its words as stop words ("it is what it is"), else 'english'.
+    Both have GIN indexes, so either way the query is index-served.
+    """
+    words = normalized_query.split()
+    if len(words) < 2:
+        return "english"
+    kept = sum(1 for word in words if word not in ENGLISH_STOPWORDS)
+    return "simple" if kept <= 1 or kept < len(words) * SIMPLE_FTS_MAX_KEPT_RATIO else "english"
+
 def is_phrase_query(query: str) -> bool:
     """Detect if query should use phrase matching (2-4 words)."""
     normalized = normalize_query(query)
@@ -69,32 +161,200 @@ def calculate_phrase_boost(text: str, phrase: str) -> float:
     
     return 1.0  # No boost
 
-def search_quotes(query: str, top_k: int = 10, speaker_filter: str = None) -> List[Dict[str, Any]]:
+def rank_rows(rows, query: str, use_phrase: bool) -> List[SearchResult]:
+    """Convert FTS rows to result dicts with boosted ranks, best first."""
+    query_normalized = normalize_query(query)
+    
+    # Convert to results format and apply phrase boost
+    results = []
+    
+    for row in rows:
+        # Get base rank (prefer phrase_rank if available, else word_rank)
+        phrase_rank = getattr(row, 'phrase_rank', None)
+        word_rank = getattr(row, 'word_rank', None)
+        
+        if use_phrase and phrase_rank is not None:
+            base_rank = float(phrase_rank) if phrase_rank else 0.0
+        elif word_rank is not None:
+            base_rank = float(word_rank) if word_rank else 0.0
+        else:
+            base_rank = 0.0
+        
+        # Check for exact phrase match (normalized)
+        text_normalized = normalize_query(row.text)
+        is_exact_match = query_normalized == text_normalized
+        
+        # Calculate phrase boost
+        phrase_boost = calculate_phrase_boost(row.text, query)
+        
+        # For exact matches, use a tiered ranking system to ensure they rank first
+        if is_exact_match:
+            quote_length = len(row.text.split())
+            if quote_length <= 5:
+                final_rank = 1000.0 + (base_rank * phrase_boost)
+            elif quote_length <= 15:
+                final_rank = 500.0 + (base_rank * phrase_boost)
+            else:
+                final_rank = 100.0 + (base_rank * phrase_boost)
+        else:
+            # Non-exact matches use boosted base rank from PostgreSQL FTS
+            final_rank = base_rank * phrase_boost
+        
+        results.append({
+            "id": row.id,
+            "episode_id": row.episode_id,
+            "episode_name": row.episode_name or "",
+            "timestamp_sec": row.timestamp_sec,
+            "timestamp_hms": fmt_time(row.timestamp_sec),
+            "speaker": row.speaker,
+            "text": row.text,
+            "spotify_url": row.spotify_url or "",
+            "rank": final_rank,
+        })
+    
+    # Sort by rank (exact matches will be first due to high base scores)
+    results.sort(key=lambda x: x['rank'], reverse=True)
+    
+    return results
+
+def with_facets(ranked_sql: str, matched_sql: str, order_by: str) -> str:
+    """
+    Extend a ranked search statement so it also returns facet counts.
+    
+    matched_sql selects every match without the speaker filter; up to
+    :facet_cap of them are counted per speaker (ignoring :facet_speaker, so
+    the other speakers' counts stay visible), per show and per series, plus
+    a total, in one GROUPING SETS pass. Every returned row carries the counts
+    as JSON in a facets column; with no hits there is a single row whose hit
+    columns are NULL.
+    """
+    return f"""
+        WITH hits AS ({ranked_sql}),
+        counted AS MATERIALIZED (
+            SELECT speaker, episode_id FROM ({matched_sql}) matched LIMIT :facet_cap
+        ),
+        facet_counts AS (
+            SELECT
+                CASE WHEN GROUPING(speaker) = 0 THEN 'speaker'
+                     WHEN GROUPING(show) = 0 THEN 'show'
+                     WHEN GROUPING(series) = 0 THEN 'series'
+                     ELSE 'total' END AS facet,
+                COALESCE(speaker, show, series) AS value,
+                CASE WHEN GROUPING(speaker) = 0 THEN COUNT(*)
+                     ELSE COUNT(*) FILTER (WHERE CAST(:facet_speaker AS text) IS NULL OR speaker = :facet_speaker)
+                     END AS count
+            FROM (
+                SELECT speaker,
+                       split_part(episode_id, '-', 1) AS show,
+                       substring(episode_id from '-s([0-9]+)') AS series
+                FROM counted
+            ) c
+            GROUP BY GROUPING SETS ((speaker), (show), (series), ())
+        )
+        SELECT hits.*, f.facets
+        FROM (SELECT json_agg(json_build_object('facet', facet, 'value', value, 'count', count)) AS facets
+              FROM facet_counts) f
+        LEFT JOIN hits ON TRUE
+        ORDER BY {order_by}
+    """
+
+def facet_params(speaker_filter: str = None) -> dict:
+    return {"facet_cap": FACET_MAX_ROWS, "facet_speaker": speaker_filter.lower() if speaker_filter else None}
+
+def split_facets(rows, facets: dict):
+    """
+    Separate hit rows from the facet counts added by with_facets, filling facets with
+    {"total", "estimated", "speaker", "show", "series"}.
+    
+    Returns:
+        The hit rows
+    """
+    counts = {"speaker": {}, "show": {}, "series": {}}
+    total = 0
+    for entry in (rows[0].facets if rows else None) or []:
+        if entry["facet"] == "total":
+            total = entry["count"]
+        elif entry["value"] is not None:
+            counts[entry["facet"]][entry["value"]] = entry["count"]
+    facets.update(counts)
+    facets["total"] = total
+    # Counting stopped at the cap, so the numbers are lower bounds
+    facets["estimated"] = sum(counts["speaker"].values()) >= FACET_MAX_ROWS
+    return [row for row in rows if row.id is not None]
+
+def search_quotes(query: str, top_k: int = 10, speaker_filter: str = None,
+                  deadline: SearchDeadline = None, facets: dict = None) -> List[SearchResult]:
     """
     Search quotes using PostgreSQL full-text search with phrase matching.
-    Uses phrase matching for better exact match results.
+    Uses phrase matching for better exact match results. Queries made mostly
+    of stop words go to the 'simple' configuration (see fts_config).
+    
+    With SEARCH_RANKER=bm25, plain 'english' queries are ranked by BM25
+    (see app/bm25.py) instead of ts_rank_cd.
+    
+    Query syntax (see app/query_syntax.py) is parsed first: speaker: prefixes
+    become the speaker filter, and phrases, exclusions, OR and episode: filters
+    are answered by a single websearch_to_tsquery statement. Plain queries of
+    more than MIN_SHOULD_MATCH_WORDS words match on most, not all, of their words.
+    
+    With a deadline, each statement runs under SET LOCAL statement_timeout,
+    the exact-match probe is skipped when the budget runs low (deadline.partial),
+    and SearchTimeout/SearchCancelled are raised instead of database errors.
+    
+    If a facets dict is passed, the same statement also counts matches per
+    speaker, show and series and fills it in (see with_facets).
     """
+    parsed = parse_query(query)
+    if parsed.speaker:
+        if speaker_filter and speaker_filter.lower() != parsed.speaker:
+            return []  # speaker:x contradicts the speaker filter
+        speaker_filter = parsed.speaker
+    if parsed.structured:
+        return search_structured(parsed, top_k, speaker_filter, deadline, facets)
+    query = parsed.text
+    
     normalized_query = normalize_query(query)
     use_phrase = is_phrase_query(query)
+    config = fts_config(normalized_query)
+    params = {"query": normalized_query}
     
+    use_bm25 = (SEARCH_RANKER == "bm25" and config == "english"
+                and len(normalized_query.split()) <= MIN_SHOULD_MATCH_WORDS)
     
-    with get_connection() as conn:
+    # Postings are ranked by ts_rank_cd, so BM25 ranks single words live
+    if (len(normalized_query.split()) == 1 and top_k * 2 <= POSTINGS_DEPTH and not use_bm25 and facets is None
+            and postings_available()):
+        # Frequent words are answered from precomputed postings instead of
+        # ranking every match
+        params.update({"speaker_key": speaker_filter.lower() if speaker_filter else "", "limit": top_k * 2})
+        sql = SINGLE_TERM_SQL.format(speaker_condition="AND speaker = :speaker_key" if speaker_filter else "")
+        rows = _fetch_rows(sql, params, deadline, "postings_query")
+        with stage("rank"):
+            results = rank_rows(rows, query, use_phrase=False)
+        return results[:top_k]
+    
+    with get_read_connection() as conn:
+        matched_query = None
+        # True when the statement reports whether a candidate cap cut matches off
+        capped_candidates = False
+        # True when the branch applies the speaker filter itself
+        filtered_inside = use_bm25
         # PostgreSQL full-text search with exact match prioritization
         if use_phrase:
             # Single FTS query (fast, uses GIN index)
             # Exact match detection happens in Python after fetching
-            sql_query = """
+            sql_query = bm25_search_sql(True, bool(speaker_filter)) if use_bm25 else f"""
                 SELECT 
                     id, episode_id, timestamp_sec, speaker, text,
                     episode_name, spotify_url,
-                    ts_rank_cd(to_tsvector('english', text), 
-                        phraseto_tsquery('english', :query), 32) as phrase_rank,
-                    ts_rank_cd(to_tsvector('english', text), 
-                        plainto_tsquery('english', :query), 32) as word_rank
+                    ts_rank_cd(to_tsvector('{config}', text), 
+                        phraseto_tsquery('{config}', :query), 32) as phrase_rank,
+                    ts_rank_cd(to_tsvector('{config}', text), 
+                        plainto_tsquery('{config}', :query), 32) as word_rank
                 FROM quotes
                 WHERE (
-                    to_tsvector('english', text) @@ phraseto_tsquery('english', :query)
-                    OR to_tsvector('english', text) @@ plainto_tsquery('english', :query)
+                    to_tsvector('{config}', text) @@ phraseto_tsquery('{config}', :query)
+                    OR to_tsvector('{config}', text) @@ plainto_tsquery('{config}', :query)
                 )
             """
             
@@ -108,49 +368,129 @@ def search_quotes(query: str, top_k: int = 10, speaker_filter: str = None) -> Li
                 WHERE TRIM(REGEXP_REPLACE(REGEXP_REPLACE(LOWER(text), '[^a-z0-9 ]', ' ', 'g'), '\s+', ' ', 'g')) = :normalized_query_text
                 AND LENGTH(text) < 100
             """
+            if config == "simple":
+                # Stop-word phrases: let the 'simple' index narrow the candidates
+                exact_match_query += " AND to_tsvector('simple', text) @@ phraseto_tsquery('simple', :normalized_query_text)"
             if speaker_filter:
                 exact_match_query += " AND speaker = :speaker"
             exact_match_query += " LIMIT 1"
+        elif len(normalized_query.split()) > MIN_SHOULD_MATCH_WORDS:
+            candidates, any_word, check, msm_params = min_should_match_sql(normalized_query, config, "doc")
+            params.update(msm_params)
+            params["candidate_limit"] = MIN_SHOULD_MATCH_MAX_CANDIDATES
+            
+            def min_should_match_query(candidate_filter: str) -> str:
+                # OFFSET 0 fences the subquery, so each candidate's tsvector is computed once
+                return f"""
+                    SELECT 
+                        id, episode_id, timestamp_sec, speaker, text,
+                        episode_name, spotify_url,
+                        0.0 as phrase_rank,
+                        ts_rank_cd(doc, {any_word}, 32) as word_rank
+                    FROM (
+                        SELECT *, to_tsvector('{config}', text) AS doc
+                        FROM quotes
+                        WHERE {candidate_filter}
+                        OFFSET 0
+                    ) candidates
+                    WHERE {check}
+                """
+            
+            # Facets count every match; ranking checks at most MIN_SHOULD_MATCH_MAX_CANDIDATES
+            # quotes, the same ones (lowest ids) on every run. Ordering by id needs no
+            # tsvectors, and the response is flagged partial when the cap cuts candidates off.
+            matched_query = min_should_match_query(f"to_tsvector('{config}', text) @@ ({candidates})")
+            speaker_condition = "AND speaker = :speaker" if speaker_filter else ""
+            ranked_query = min_should_match_query(
+                "id IN (SELECT id FROM capped ORDER BY id LIMIT :candidate_limit)")
+            sql_query = f"""
+                WITH capped AS MATERIALIZED (
+                    SELECT id FROM quotes
+                    WHERE to_tsvector('{config}', text) @@ ({candidates}) {speaker_condition}
+                    ORDER BY id
+                    LIMIT :candidate_limit + 1
+                )
+                SELECT hits.*, c.candidates_capped
+                FROM (SELECT COUNT(*) > :candidate_limit AS candidates_capped FROM capped) c
+                LEFT JOIN ({ranked_query}) hits ON TRUE
+            """
+            filtered_inside = capped_candidates = True
+        elif use_bm25:
+            sql_query = bm25_search_sql(False, bool(speaker_filter))
         else:
-            # Single word or many words - use standard word matching
-            sql_query = """
+            # Single word or a few words - use standard word matching
+            sql_query = f"""
                 SELECT 
                     id, episode_id, timestamp_sec, speaker, text,
                     episode_name, spotify_url,
                     0.0 as phrase_rank,
-                    ts_rank_cd(to_tsvector('english', text), 
-                        plainto_tsquery('english', :query), 32) as word_rank
+                    ts_rank_cd(to_tsvector('{config}', text), 
+                        plainto_tsquery('{config}', :query), 32) as word_rank
                 FROM quotes
-                WHERE to_tsvector('english', text) @@ plainto_tsquery('english', :query)
+                WHERE to_tsvector('{config}', text) @@ plainto_tsquery('{config}', :query)
             """
         
-        params = {"query": normalized_query}
-        
+        if matched_query is None:
+            matched_query = bm25_search_sql(use_phrase) if use_bm25 else sql_query
         if speaker_filter:
             params["speaker"] = speaker_filter.lower()
-            sql_query += " AND speaker = :speaker"
+            if not filtered_inside:  # e.g. bm25_search_sql filters inside its candidate subquery
+                sql_query += " AND speaker = :speaker"
         
-        sql_query += " ORDER BY phrase_rank DESC, word_rank DESC, timestamp_sec ASC LIMIT :limit"
+        order_by = "phrase_rank DESC, word_rank DESC, timestamp_sec ASC"
+        sql_query += f" ORDER BY {order_by} LIMIT :limit"
         params["limit"] = top_k * 2  # Get more results to apply boost, then trim
+        if facets is not None:
+            sql_query = with_facets(sql_query, matched_query, order_by)
+            params.update(facet_params(speaker_filter))
         
         # Check for exact match separately (only for phrase queries)
-        exact_match_row = None
-        if use_phrase:
-            exact_params = {"normalized_query_text": normalized_query}
-            if speaker_filter:
-                exact_params["speaker"] = speaker_filter.lower()
-            try:
-                exact_result = conn.execute(text(exact_match_query), exact_params)
-                exact_match_row = exact_result.fetchone()
-            except:
-                pass  # If exact match query fails, continue with FTS results
-        
-        # Execute query
-        result = conn.execute(text(sql_query), params)
-        rows = result.fetchall()
-        
-        # Normalize query once for comparison
-        query_normalized = normalize_query(query)
+        if deadline:
+            deadline.attach(conn)
+        try:
+            exact_match_row = None
+            if use_phrase and deadline and not deadline.allows_optional_stage():
+                # Budget is running low: skip the exact-match probe, serve FTS results only
+                deadline.partial = True
+            elif use_phrase:
+                exact_params = {"normalized_query_text": normalized_query}
+                if speaker_filter:
+                    exact_params["speaker"] = speaker_filter.lower()
+                try:
+                    # Savepoint so a failed/timed-out probe doesn't abort the FTS query
+                    with stage("exact_match_query"), conn.begin_nested():
+                        probe_sql = exact_match_query
+                        if deadline:
+                            # The probe may use at most half of what is left
+                            probe_sql = deadline.statement_timeout_sql(0.5) + probe_sql
+                        exact_result = conn.execute(text(probe_sql), exact_params)
+                        exact_match_row = exact_result.fetchone()
+                except (SearchTimeout, SearchCancelled):
+                    raise
+                except Exception:
+                    # If exact match query fails, continue with FTS results
+                    if deadline:
+                        deadline.check()
+                        deadline.partial = True
+            
+            # Execute query
+            with stage("fts_query"):
+                if deadline:
+                    sql_query = deadline.statement_timeout_sql() + sql_query
+                result = conn.execute(text(sql_query), params)
+                rows = result.fetchall()
+            if capped_candidates and deadline and rows and rows[0].candidates_capped:
+                deadline.partial = True
+            if facets is not None:
+                rows = split_facets(rows, facets)
+            elif capped_candidates:
+                # Without hits the statement still returns one row, carrying the flag
+                rows = [row for row in rows if row.id is not None]
+        except DBAPIError as e:
+            raise translate_cancellation(e, deadline) from e
+        finally:
+            if deadline:
+                deadline.detach()
         
         # If we found an exact match separately, check if it's already in FTS results
         exact_match_id = None
@@ -174,57 +514,519 @@ def search_quotes(query: str, top_k: int = 10, speaker_filter: str = None) -> Li
                 )
                 rows = [exact_row] + list(rows)
         
-        # Convert to results format and apply phrase boost
-        results = []
+        with stage("rank"):
+            results = rank_rows(rows, query, use_phrase)
         
-        for row in rows:
-            # Get base rank (prefer phrase_rank if available, else word_rank)
-            phrase_rank = getattr(row, 'phrase_rank', None)
-            word_rank = getattr(row, 'word_rank', None)
-            
-            if use_phrase and phrase_rank is not None:
-                base_rank = float(phrase_rank) if phrase_rank else 0.0
-            elif word_rank is not None:
-                base_rank = float(word_rank) if word_rank else 0.0
-            else:
-                base_rank = 0.0
-            
-            # Check for exact phrase match (normalized)
-            text_normalized = normalize_query(row.text)
-            is_exact_match = query_normalized == text_normalized
-            
-            # Calculate phrase boost
-            phrase_boost = calculate_phrase_boost(row.text, query)
-            
-            # For exact matches, use a tiered ranking system to ensure they rank first
-            if is_exact_match:
-                quote_length = len(row.text.split())
-                if quote_length <= 5:
-                    final_rank = 1000.0 + (base_rank * phrase_boost)
-                elif quote_length <= 15:
-                    final_rank = 500.0 + (base_rank * phrase_boost)
-                else:
-                    final_rank = 100.0 + (base_rank * phrase_boost)
-            else:
-                # Non-exact matches use boosted base rank from PostgreSQL FTS
-                final_rank = base_rank * phrase_boost
-            
-            results.append({
-                "episode_id": row.episode_id,
-                "episode_name": row.episode_name or "",
+        # Limit to top_k
+        return results[:top_k]
+
+def min_should_match_sql(normalized_query: str, config: str, doc: str):
+    """
+    Minimum-should-match for a long natural-language query: a quote must contain
+    MIN_SHOULD_MATCH_RATIO of the query's distinct lexemes (stop words included
+    under 'simple'), counted on doc (an SQL expression for the quote's tsvector).
+    
+    A match contains k = CEIL(n * ratio) of the n lexemes, so it contains at least
+    one of any n - k + 1 of them: only the most selective n - k + 1 words (rarest
+    in the corpus, never stop words while others remain) select candidates from
+    the GIN index, which finds every match without scanning common words' quotes.
+    
+    Returns:
+        (candidates, any_word, check, params): tsquery expressions selecting
+        candidates and matching any of the query's words (for ranking), the
+        ratio condition, and their bind parameters
+    """
+    from app.spelling import word_frequency
+
+    words = sorted(set(normalized_query.split()))
+    if config != "simple":
+        words = [w for w in words if w not in ENGLISH_STOPWORDS] or words[:1]
+    needed = len(words) - max(1, math.ceil(len(words) * MIN_SHOULD_MATCH_RATIO)) + 1
+
+    def selectivity(word: str) -> tuple:
+        # Without corpus frequencies (index still loading), longer words are usually rarer
+        frequency = word_frequency(word)
+        return (word in ENGLISH_STOPWORDS, -len(word) if frequency is None else frequency, word)
+
+    words.sort(key=selectivity)
+    any_word = " || ".join(f"plainto_tsquery('{config}', :term{i})" for i in range(len(words)))
+    candidates = " || ".join(f"plainto_tsquery('{config}', :term{i})" for i in range(needed))
+    params = {f"term{i}": word for i, word in enumerate(words)}
+    params["terms"] = normalized_query
+    params["min_match_ratio"] = MIN_SHOULD_MATCH_RATIO
+    # to_tsvector of a constant is folded once at plan time
+    check = f"""(SELECT COUNT(*) FROM unnest(tsvector_to_array({doc})) AS lexeme
+                 WHERE lexeme = ANY(tsvector_to_array(to_tsvector('{config}', :terms))))
+                >= GREATEST(1, CEIL(length(to_tsvector('{config}', :terms)) * :min_match_ratio))"""
+    return candidates, any_word, check, params
+
+def structured_filters(parsed: ParsedQuery):
+    """
+    SQL conditions (each starting with AND) and parameters for a parsed query's
+    episode filter and speaker/episode exclusions.
+    """
+    sql, params = "", {}
+    if parsed.episode:
+        sql += " AND episode_id = :episode"
+        params["episode"] = parsed.episode
+    if parsed.excluded_speakers:
+        sql += " AND speaker <> ALL(CAST(:excluded_speakers AS text[]))"
+        params["excluded_speakers"] = parsed.excluded_speakers
+    if parsed.excluded_episodes:
+        sql += " AND episode_id <> ALL(CAST(:excluded_episodes AS text[]))"
+        params["excluded_episodes"] = parsed.excluded_episodes
+    return sql, params
+
+def _fetch_rows(sql: str, params: dict, deadline: SearchDeadline, stage_name: str):
+    """Run one read query under the deadline (if any)."""
+    with get_read_connection() as conn:
+        if deadline:
+            deadline.attach(conn)
+            sql = deadline.statement_timeout_sql() + sql
+        try:
+            with stage(stage_name):
+                return conn.execute(text(sql), params).fetchall()
+        except DBAPIError as e:
+            raise translate_cancellation(e, deadline) from e
+        finally:
+            if deadline:
+                deadline.detach()
+
+def search_structured(parsed: ParsedQuery, top_k: int = 10, speaker_filter: str = None,
+                      deadline: SearchDeadline = None, facets: dict = None) -> List[SearchResult]:
+    """
+    Answer a query using phrase/exclusion/OR syntax or field filters with one
+    statement: websearch_to_tsquery on the GIN index, filters in the same WHERE
+    (and facet counts, if a facets dict is passed).
+    """
+    if not parsed.text:
+        return []  # Only exclusions: nothing for the index to look up
+    config = fts_config(normalize_query(parsed.text))
+    sql = f"""
+        SELECT id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url,
+               ts_rank_cd(to_tsvector('{config}', text), websearch_to_tsquery('{config}', :query), 32) AS word_rank
+        FROM quotes
+        WHERE to_tsvector('{config}', text) @@ websearch_to_tsquery('{config}', :query)
+    """
+    params = {"query": parsed.websearch, "limit": top_k * 2}
+    filters, filter_params = structured_filters(parsed)
+    sql += filters
+    params.update(filter_params)
+    matched_sql = sql
+    if speaker_filter:
+        sql += " AND speaker = :speaker"
+        params["speaker"] = speaker_filter.lower()
+    order_by = "word_rank DESC, timestamp_sec ASC"
+    sql += f" ORDER BY {order_by} LIMIT :limit"
+    if facets is not None:
+        sql = with_facets(sql, matched_sql, order_by)
+        params.update(facet_params(speaker_filter))
+    
+    rows = _fetch_rows(sql, params, deadline, "structured_query")
+    if facets is not None:
+        rows = split_facets(rows, facets)
+    with stage("rank"):
+        results = rank_rows(rows, parsed.text, use_phrase=False)
+    return results[:top_k]
+
+# Batch search: one statement for every item. Each (query, speaker, limit) row of
+# the unnested arrays drives a LATERAL FTS lookup on the GIN index for its text
+# search configuration (the branch for the other one is skipped by a one-time
+# filter); exact matches for all phrase items come from a single pass over short
+# quotes, hash-joined on the normalized text. Phrase matches are a subset of
+# plainto matches, so the plainto condition alone selects the candidates.
+BATCH_FTS_BRANCH = """
+        (SELECT
+            qt.id, qt.episode_id, qt.timestamp_sec, qt.speaker, qt.text,
+            qt.episode_name, qt.spotify_url,
+            CASE WHEN items.use_phrase
+                THEN ts_rank_cd(to_tsvector('{config}', qt.text), phraseto_tsquery('{config}', items.query), 32)
+                ELSE 0.0 END::real AS phrase_rank,
+            ts_rank_cd(to_tsvector('{config}', qt.text), plainto_tsquery('{config}', items.query), 32) AS word_rank
+        FROM quotes qt
+        WHERE items.config = '{config}'
+          AND to_tsvector('{config}', qt.text) @@ plainto_tsquery('{config}', items.query)
+          AND (items.speaker IS NULL OR qt.speaker = items.speaker)
+        ORDER BY phrase_rank DESC, word_rank DESC, qt.timestamp_sec ASC
+        LIMIT items.row_limit)
+"""
+
+BATCH_SEARCH_SQL = f"""
+    WITH items AS (
+        SELECT *
+        FROM unnest(CAST(:queries AS text[]), CAST(:speakers AS text[]),
+                    CAST(:limits AS integer[]), CAST(:phrases AS boolean[]), CAST(:configs AS text[]))
+             WITH ORDINALITY AS t(query, speaker, row_limit, use_phrase, config, item)
+    )
+    SELECT items.item, m.*, FALSE AS exact
+    FROM items
+    CROSS JOIN LATERAL (
+        {BATCH_FTS_BRANCH.format(config="english")}
+        UNION ALL
+        {BATCH_FTS_BRANCH.format(config="simple")}
+    ) m
+"""
+
+BATCH_EXACT_MATCH_SQL = r"""
+    UNION ALL
+    (
+        SELECT DISTINCT ON (items.item)
+            items.item, qt.id, qt.episode_id, qt.timestamp_sec, qt.speaker, qt.text,
+            qt.episode_name, qt.spotify_url, 1000.0::real, 1000.0::real, TRUE
+        FROM items
+        JOIN (
+            SELECT *, TRIM(REGEXP_REPLACE(REGEXP_REPLACE(LOWER(text), '[^a-z0-9 ]', ' ', 'g'), '\s+', ' ', 'g')) AS normalized_text
+            FROM quotes
+            WHERE LENGTH(text) < 100
+        ) qt ON qt.normalized_text = items.query
+            AND (items.speaker IS NULL OR qt.speaker = items.speaker)
+        WHERE items.use_phrase
+        ORDER BY items.item, qt.id
+    )
+"""
+
+def is_plain_query(query: str) -> bool:
+    """True if query uses no query syntax and is short enough to need every word."""
+    parsed = parse_query(query)
+    return (not parsed.structured and parsed.speaker is None
+            and len(normalize_query(query).split()) <= MIN_SHOULD_MATCH_WORDS)
+
+def search_quotes_batch(items, deadline: SearchDeadline = None) -> List[List[SearchResult]]:
+    """
+    Run several searches in a single database round trip.
+    Items using query syntax or minimum-should-match (and every item under
+    BM25 ranking) need their own statement shapes, so they run one by one
+    through search_quotes.
+    
+    Args:
+        items: (query, speaker_filter, top_k) tuples
+        deadline: optional budget for the whole batch (see search_quotes)
+    
+    Returns:
+        One result list per item, in input order, ranked exactly like search_quotes
+    """
+    results = [None] * len(items)
+    plain = [i for i, (query, _, _) in enumerate(items) if is_plain_query(query)] if SEARCH_RANKER != "bm25" else []
+    for i, plain_results in zip(plain, _search_plain_batch([items[i] for i in plain], deadline)):
+        results[i] = plain_results
+    for i, (query, speaker, top_k) in enumerate(items):
+        if results[i] is None:
+            results[i] = search_quotes(query, top_k=top_k, speaker_filter=speaker, deadline=deadline)
+    return results
+
+def _search_plain_batch(items, deadline: SearchDeadline = None) -> List[List[SearchResult]]:
+    if not items:
+        return []
+    params = {
+        # Normalized text serves both the tsquery and the exact-match comparison
+        "queries": [normalize_query(query) for query, _, _ in items],
+        "speakers": [speaker.lower() if speaker else None for _, speaker, _ in items],
+        # Fetch extra rows per item so the phrase boost can reorder them, as search_quotes does
+        "limits": [top_k * 2 for _, _, top_k in items],
+        "phrases": [is_phrase_query(query) for query, _, _ in items],
+        "configs": [fts_config(normalize_query(query)) for query, _, _ in items],
+    }
+    
+    sql = BATCH_SEARCH_SQL
+    if deadline and not deadline.allows_optional_stage():
+        # Budget is running low: skip the exact-match pass, serve FTS results only
+        deadline.partial = True
+    elif any(params["phrases"]):
+        sql += BATCH_EXACT_MATCH_SQL
+    if deadline:
+        sql = deadline.statement_timeout_sql() + sql
+    
+    with get_read_connection() as conn:
+        if deadline:
+            deadline.attach(conn)
+        try:
+            with stage("batch_query"):
+                rows = conn.execute(text(sql), params).fetchall()
+        except DBAPIError as e:
+            raise translate_cancellation(e, deadline) from e
+        finally:
+            if deadline:
+                deadline.detach()
+    
+    fts_rows = [[] for _ in items]
+    exact_rows = [None] * len(items)
+    for row in rows:
+        index = row.item - 1
+        if row.exact:
+            exact_rows[index] = row
+        else:
+            fts_rows[index].append(row)
+    
+    results = []
+    with stage("rank"):
+        for (query, _, top_k), candidates, exact_row, use_phrase in zip(items, fts_rows, exact_rows, params["phrases"]):
+            # An exact match not already among the FTS hits goes in with its 1000 rank
+            if exact_row is not None and not any(row.id == exact_row.id for row in candidates):
+                candidates = [exact_row] + candidates
+            results.append(rank_rows(candidates, query, use_phrase)[:top_k])
+    return results
+
+def substring_pattern(query: str, wildcard: bool = False) -> str:
+    """
+    LIKE pattern matching query anywhere in a quote's normalized text.
+    In wildcard mode * matches any run of characters and ? a single one.
+    
+    Raises:
+        ValueError: if the query has no literal run of SUBSTRING_MIN_LITERAL characters
+    """
+    keep = r"[^a-z0-9 *?]" if wildcard else r"[^a-z0-9 ]"
+    # Same normalization as NORMALIZED_TEXT_SQL, so LIKE metacharacters never survive
+    normalized = " ".join(re.sub(keep, " ", query.lower()).split())
+    literals = re.split(r"[*?]", normalized)
+    if max(len(part.strip()) for part in literals) < SUBSTRING_MIN_LITERAL:
+        raise ValueError(f"Substring searches need at least {SUBSTRING_MIN_LITERAL} consecutive letters or digits")
+    if wildcard:
+        normalized = normalized.replace("*", "%").replace("?", "_")
+    return f"%{normalized}%"
+
+def search_substring(query: str, top_k: int = 10, speaker_filter: str = None,
+                     deadline: SearchDeadline = None, wildcard: bool = False) -> List[SearchResult]:
+    """
+    Find quotes containing query (or matching a * / ? wildcard pattern) as a
+    substring, for fragments full-text search can't match: partial words,
+    stopwords, numbers.
+    
+    Matches come from the pg_trgm index on the normalized text when it exists.
+    At most SUBSTRING_MAX_SCAN of them are read, so a short, common fragment
+    doesn't sort its whole match set; the shortest SUBSTRING_MAX_CANDIDATES of
+    those are ranked like search_quotes results.
+    
+    Raises:
+        ValueError: if the query is too short to search for (see substring_pattern)
+    """
+    params = {
+        "pattern": substring_pattern(query, wildcard),
+        "scan_limit": SUBSTRING_MAX_SCAN,
+        "limit": SUBSTRING_MAX_CANDIDATES,
+    }
+    matches = f"""
+        SELECT id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url
+        FROM quotes
+        WHERE {NORMALIZED_TEXT_SQL} LIKE :pattern
+    """
+    if speaker_filter:
+        matches += " AND speaker = :speaker"
+        params["speaker"] = speaker_filter.lower()
+    sql = f"""
+        SELECT *, 1.0 AS word_rank
+        FROM ({matches} LIMIT :scan_limit) matches
+        ORDER BY LENGTH(text), timestamp_sec, id
+        LIMIT :limit
+    """
+    
+    rows = _fetch_rows(sql, params, deadline, "substring_query")
+    with stage("rank"):
+        results = rank_rows(rows, query.replace("*", " ").replace("?", " "), use_phrase=False)
+    return results[:top_k]
+
+def iter_matches(query: str, speaker_filter: str = None, phrase: bool = False,
+                 limit: int = None, fetch_size: int = 1000, statement_timeout_ms: int = None):
+    """
+    Yield every quote matching query (up to limit), ordered by episode and timestamp.
+    
+    Matches are the quotes search_quotes would find: the same query syntax,
+    text search configuration and minimum-should-match rule (phrase=True
+    requires the whole plain query as a phrase instead).
+    
+    Rows come from a server-side cursor fetch_size at a time, so memory stays
+    constant however many quotes match. The read connection is held until the
+    generator is exhausted or closed.
+    """
+    parsed = parse_query(query)
+    if parsed.speaker:
+        if speaker_filter and speaker_filter.lower() != parsed.speaker:
+            return  # speaker:x contradicts the speaker filter
+        speaker_filter = parsed.speaker
+    if not parsed.text:
+        return
+    normalized_query = normalize_query(parsed.text)
+    config = fts_config(normalized_query)
+    document = f"to_tsvector('{config}', text)"
+    params = {"query": normalized_query}
+    if parsed.structured:
+        condition = f"{document} @@ websearch_to_tsquery('{config}', :query)"
+        params["query"] = parsed.websearch
+        filters, filter_params = structured_filters(parsed)
+        condition += filters
+        params.update(filter_params)
+    elif phrase:
+        condition = f"{document} @@ phraseto_tsquery('{config}', :query)"
+    elif len(normalized_query.split()) > MIN_SHOULD_MATCH_WORDS:
+        candidates, _, check, msm_params = min_should_match_sql(normalized_query, config, document)
+        condition = f"{document} @@ ({candidates}) AND {check}"
+        params.update(msm_params)
+    else:
+        condition = f"{document} @@ plainto_tsquery('{config}', :query)"
+    sql = f"""
+        SELECT episode_id, episode_name, timestamp_sec, speaker, text, spotify_url
+        FROM quotes
+        WHERE {condition}
+    """
+    if speaker_filter:
+        sql += " AND speaker = :speaker"
+        params["speaker"] = speaker_filter.lower()
+    sql += " ORDER BY episode_id, timestamp_sec, id"
+    if limit is not None:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    
+    with get_read_connection() as conn:
+        with conn.begin():
+            if statement_timeout_ms:
+                # Applies to each FETCH from the cursor, not the whole export
+                conn.execute(text(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}"))
+            result = conn.execution_options(stream_results=True, yield_per=fetch_size).execute(text(sql), params)
+            for row in result:
+                yield {
+                    "episode_id": row.episode_id,
+                    "episode_name": row.episode_name or "",
+                    "timestamp_sec": row.timestamp_sec,
+                    "timestamp_hms": fmt_time(row.timestamp_sec),
+                    "speaker": row.speaker,
+                    "text": row.text,
+                    "spotify_url": row.spotify_url or "",
+                }
+
+# Surrounding lines for many anchors in one statement: each (episode_id, timestamp)
+# drives two LATERAL range scans on idx_quotes_episode_timestamp, one backwards
+# and one forwards, each stopping after :lines rows.
+# Lines are ordered by (timestamp_sec, id), like transcript pages, so lines sharing
+# the anchor's second are neighbours too; an anchor without an id is the first
+# line at its second
+CONTEXT_SQL = """
+    WITH anchors AS (
+        SELECT a.anchor, a.episode_id, a.timestamp_sec,
+               COALESCE(a.id, (SELECT MIN(q.id) FROM quotes q
+                               WHERE q.episode_id = a.episode_id AND q.timestamp_sec = a.timestamp_sec), 0) AS id
+        FROM unnest(CAST(:episodes AS text[]), CAST(:timestamps AS integer[]), CAST(:ids AS integer[]))
+             WITH ORDINALITY AS a(episode_id, timestamp_sec, id, anchor)
+    )
+    SELECT anchors.anchor, c.side, c.timestamp_sec, c.speaker, c.text
+    FROM anchors
+    CROSS JOIN LATERAL (
+        (SELECT -1 AS side, q.timestamp_sec, q.id, q.speaker, q.text
+         FROM quotes q
+         WHERE q.episode_id = anchors.episode_id
+           AND (q.timestamp_sec, q.id) < (anchors.timestamp_sec, anchors.id)
+         ORDER BY q.timestamp_sec DESC, q.id DESC
+         LIMIT :lines)
+        UNION ALL
+        (SELECT 1 AS side, q.timestamp_sec, q.id, q.speaker, q.text
+         FROM quotes q
+         WHERE q.episode_id = anchors.episode_id
+           AND (q.timestamp_sec, q.id) > (anchors.timestamp_sec, anchors.id)
+         ORDER BY q.timestamp_sec ASC, q.id ASC
+         LIMIT :lines)
+    ) c
+    ORDER BY anchors.anchor, c.side, c.timestamp_sec, c.id
+"""
+
+def get_context(anchors, lines: int = 2, deadline: SearchDeadline = None) -> List[dict]:
+    """
+    Fetch the dialogue around many transcript lines in one query.
+    
+    Args:
+        anchors: (episode_id, timestamp_sec) or (episode_id, timestamp_sec, id) tuples
+        lines: how many lines to return on each side
+    
+    Returns:
+        One {"before": [...], "after": [...]} dict per anchor, in input order,
+        each list in transcript order
+    """
+    context = [{"before": [], "after": []} for _ in anchors]
+    if not anchors or lines <= 0:
+        return context
+    params = {
+        "episodes": [anchor[0] for anchor in anchors],
+        "timestamps": [int(anchor[1]) for anchor in anchors],
+        "ids": [anchor[2] if len(anchor) > 2 else None for anchor in anchors],
+        "lines": lines,
+    }
+    sql = CONTEXT_SQL
+    if deadline:
+        sql = deadline.statement_timeout_sql() + sql
+    
+    with get_read_connection() as conn:
+        if deadline:
+            deadline.attach(conn)
+        try:
+            with stage("context_query"):
+                rows = conn.execute(text(sql), params).fetchall()
+        except DBAPIError as e:
+            raise translate_cancellation(e, deadline) from e
+        finally:
+            if deadline:
+                deadline.detach()
+    
+    for row in rows:
+        context[row.anchor - 1]["before" if row.side < 0 else "after"].append({
+            "timestamp_sec": row.timestamp_sec,
+            "timestamp_hms": fmt_time(row.timestamp_sec),
+            "speaker": row.speaker,
+            "text": row.text,
+        })
+    return context
+
+def get_transcript_page(episode_id: str, after: tuple = None, from_timestamp: int = None,
+                        speaker_filter: str = None, limit: int = 50) -> dict:
+    """
+    Read an episode's transcript in order, one keyset page at a time.
+    
+    Args:
+        after: (timestamp_sec, id) of the last line already seen
+        from_timestamp: jump straight to the first line at or after this second
+    
+    Returns:
+        {"lines": [...], "has_more": bool}; each seek is a range scan on
+        idx_quotes_episode_timestamp_id, so deep pages cost the same as the first
+    """
+    sql = """
+        SELECT id, timestamp_sec, speaker, text, episode_name, spotify_url
+        FROM quotes
+        WHERE episode_id = :episode_id
+    """
+    params = {"episode_id": episode_id, "limit": limit + 1}
+    if after is not None:
+        sql += " AND (timestamp_sec, id) > (:after_timestamp, :after_id)"
+        params["after_timestamp"], params["after_id"] = after
+    if from_timestamp is not None:
+        sql += " AND timestamp_sec >= :from_timestamp"
+        params["from_timestamp"] = from_timestamp
+    if speaker_filter:
+        sql += " AND speaker = :speaker"
+        params["speaker"] = speaker_filter.lower()
+    # One extra row tells us whether another page exists
+    sql += " ORDER BY timestamp_sec, id LIMIT :limit"
+    
+    with get_read_connection() as conn:
+        rows = conn.execute(text(sql), params).fetchall()
+    
+    return {
+        "episode_name": rows[0].episode_name or "" if rows else None,
+        "spotify_url": rows[0].spotify_url or "" if rows else None,
+        "lines": [
+            {
+                "id": row.id,
                 "timestamp_sec": row.timestamp_sec,
                 "timestamp_hms": fmt_time(row.timestamp_sec),
                 "speaker": row.speaker,
                 "text": row.text,
-                "spotify_url": row.spotify_url or "",
-                "rank": final_rank,
-            })
-        
-        # Sort by rank (exact matches will be first due to high base scores)
-        results.sort(key=lambda x: x['rank'], reverse=True)
-        
-        # Limit to top_k
-        return results[:top_k]
+            }
+            for row in rows[:limit]
+        ],
+        "has_more": len(rows) > limit,
+    }
+
+def episode_exists(episode_id: str) -> bool:
+    """True if any quote belongs to episode_id."""
+    with get_read_connection() as conn:
+        return conn.execute(text("SELECT EXISTS (SELECT 1 FROM quotes WHERE episode_id = :episode_id)"),
+                            {"episode_id": episode_id}).scalar()
 
 def log_search(query: str, top_k: int, ip: str, user_agent: str):
     """Log search queries for analytics."""
@@ -244,6 +1046,24 @@ def log_search(query: str, top_k: int, ip: str, user_agent: str):
         # Don't fail the search if logging fails
         print(f"Failed to log search: {e}")
 
+def log_searches(searches, ip: str, user_agent: str):
+    """Log several (query, top_k) searches for analytics in one insert."""
+    if not searches:
+        return
+    try:
+        with get_connection() as conn:
+            with conn.begin():
+                conn.execute(text("""
+                    INSERT INTO search_log (ts, query, topk, ip, user_agent)
+                    VALUES (EXTRACT(EPOCH FROM NOW())::INTEGER, :query, :topk, :ip, :user_agent)
+                """), [
+                    {"query": query, "topk": top_k, "ip": ip, "user_agent": user_agent}
+                    for query, top_k in searches
+                ])
+    except Exception as e:
+        # Don't fail the search if logging fails
+        print(f"Failed to log searches: {e}")
+
 def log_visit(ip: str, user_agent: str, path: str):
     """Log page visits for visitor tracking."""
     try:
@@ -263,7 +1083,7 @@ def log_visit(ip: str, user_agent: str, path: str):
 
 def get_stats():
     """Get database statistics."""
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         result = conn.execute(text("""
             SELECT 
                 COUNT(*) as total_quotes,
@@ -288,7 +1108,7 @@ def get_visitor_stats(days: int = None):
     Returns:
         Dictionary with visitor statistics
     """
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         if days:
             result = conn.execute(text(f"""
                 SELECT 
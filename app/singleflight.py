@@ -0,0 +1,118 @@
+"""
+Single-flight request coalescing.
+Concurrent calls with the same key share one execution and all receive its
+result (or exception). Works for threaded sync callers and asyncio callers,
+which can also share a flight with each other.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app import metrics
+
+class _Flight:
+    """One in-progress execution and the callers waiting on it."""
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiters = 0
+        self.on_abandon: Optional[Callable[[], None]] = None
+
+def _discard_result(future: asyncio.Future):
+    """Mark a result nobody awaits as retrieved, so its exception isn't logged as unhandled."""
+    if not future.cancelled():
+        future.exception()
+
+class SingleFlight:
+    """Deduplicate concurrent identical calls by key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Flight] = {}
+
+    def _join(self, key: Hashable) -> Tuple[_Flight, bool]:
+        """Return (flight, is_leader) for key, registering a new flight if none is running."""
+        with self._lock:
+            flight = self._calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._calls[key] = flight
+                metrics.incr(f"{self.name}.executions")
+            else:
+                metrics.incr(f"{self.name}.coalesced")
+            flight.waiters += 1
+            return flight, leader
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        """Stop new callers joining flight (a newer flight for key is left alone). Hold _lock."""
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+
+    def _run(self, key: Hashable, flight: _Flight, fn: Callable, args: tuple, kwargs: dict):
+        """Execute fn and publish its outcome to everyone waiting on the flight."""
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._forget(key, flight)
+            metrics.incr(f"{self.name}.errors")
+            flight.future.set_exception(e)
+            return
+        with self._lock:
+            self._forget(key, flight)
+        flight.future.set_result(result)
+
+    def _leave(self, key: Hashable, flight: _Flight, abandoned: bool):
+        """Drop one waiter; if the last one gave up, tell the execution to stop."""
+        with self._lock:
+            flight.waiters -= 1
+            call_abandon = abandoned and flight.waiters == 0 and not flight.future.done()
+            if call_abandon:
+                # The execution is being cancelled, so identical calls from now on start afresh
+                self._forget(key, flight)
+        if call_abandon:
+            metrics.incr(f"{self.name}.abandoned")
+            if flight.on_abandon is not None:
+                flight.on_abandon()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless an identical call is in flight; block for the shared result."""
+        flight, leader = self._join(key)
+        try:
+            if leader:
+                self._run(key, flight, fn, args, kwargs)
+            return flight.future.result()
+        finally:
+            self._leave(key, flight, abandoned=False)
+
+    async def do_async(self, key: Hashable, fn: Callable, *args,
+                       on_abandon: Callable[[], None] = None, **kwargs) -> Any:
+        """
+        Async variant: the leader starts fn in a worker thread and everyone awaits the result.
+
+        If every async waiter is cancelled before the result is ready, on_abandon
+        (supplied by the leader) is called so the execution can stop early.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            flight.on_abandon = on_abandon
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._run, key, flight, fn, args, kwargs)
+        abandoned = False
+        shared = asyncio.wrap_future(flight.future)
+        try:
+            # Shield so one cancelled waiter doesn't cancel the shared future for the rest
+            return await asyncio.shield(shared)
+        except asyncio.CancelledError:
+            abandoned = True
+            shared.add_done_callback(_discard_result)
+            raise
+        finally:
+            self._leave(key, flight, abandoned)
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently executing."""
+        with self._lock:
+            return len(self._calls)
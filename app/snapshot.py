@@ -0,0 +1,225 @@
+"""
+Local read-only snapshot of the quotes corpus for degraded-mode serving.
+A SQLite file with an FTS5 index, rebuilt whenever the dataset version
+changes, so search keeps working while PostgreSQL is unavailable.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Iterable, List, Optional
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "out/quotes_snapshot.db")
+
+# Rows fetched per round trip when copying the corpus out of PostgreSQL
+SNAPSHOT_BATCH_SIZE = 5000
+# Seconds to wait before retrying a failed rebuild (refresh_if_stale runs per search)
+SNAPSHOT_RETRY_INTERVAL = float(os.getenv("SNAPSHOT_RETRY_INTERVAL", "60"))
+
+# -word and -"phrase" exclusions in a parsed query's websearch text
+EXCLUSION_RE = re.compile(r'(?:^|\s)-("[^"]*"|\S+)')
+
+_local = threading.local()
+_rebuild_lock = threading.Lock()
+# Last dataset version the snapshot was confirmed to match (skips repeat checks)
+_checked_version: Optional[str] = None
+# When the last rebuild failed (monotonic seconds)
+_failed_at: Optional[float] = None
+
+def build_snapshot(rows: Iterable[dict], version: str, path: str = SNAPSHOT_PATH):
+    """Write rows to a new snapshot file and atomically swap it into place."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("""
+            CREATE TABLE quotes (
+                id INTEGER PRIMARY KEY,
+                episode_id TEXT NOT NULL,
+                timestamp_sec INTEGER NOT NULL,
+                speaker TEXT NOT NULL,
+                text TEXT NOT NULL,
+                episode_name TEXT,
+                spotify_url TEXT
+            );
+            CREATE INDEX idx_quotes_episode_timestamp ON quotes(episode_id, timestamp_sec);
+            CREATE VIRTUAL TABLE quotes_fts USING fts5(
+                text, content='quotes', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        conn.executemany("""
+            INSERT INTO quotes (id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url)
+            VALUES (:id, :episode_id, :timestamp_sec, :speaker, :text, :episode_name, :spotify_url)
+        """, ({"id": None, **row} if "id" not in row else row for row in rows))
+        conn.execute("INSERT INTO quotes_fts(quotes_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (version,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+def build_snapshot_from_database(version: str, path: str = SNAPSHOT_PATH):
+    """Copy the corpus out of PostgreSQL into a fresh snapshot."""
+    from sqlalchemy import text
+    from app.database import get_read_connection
+
+    def stream_rows():
+        with get_read_connection() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=SNAPSHOT_BATCH_SIZE).execute(text("""
+                SELECT id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url
+                FROM quotes ORDER BY id
+            """))
+            for row in result:
+                yield dict(row._mapping)
+
+    build_snapshot(stream_rows(), version, path)
+
+def _connection(path: str = SNAPSHOT_PATH) -> Optional[sqlite3.Connection]:
+    """Per-thread read-only connection, reopened when the file is replaced."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = getattr(_local, "conn", None)
+    if cached is not None and _local.mtime == mtime and _local.path == path:
+        return cached
+    if cached is not None:
+        cached.close()
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    _local.conn, _local.mtime, _local.path = conn, mtime, path
+    return conn
+
+def snapshot_version(path: str = SNAPSHOT_PATH) -> Optional[str]:
+    """Version of the dataset the snapshot was built from (None if there is no snapshot)."""
+    conn = _connection(path)
+    if conn is None:
+        return None
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return row["value"] if row else None
+
+def is_available(path: str = SNAPSHOT_PATH) -> bool:
+    return os.path.exists(path)
+
+def refresh_if_stale(version: Optional[str], path: str = SNAPSHOT_PATH) -> bool:
+    """
+    Rebuild the snapshot in a background thread if it doesn't match version.
+
+    Returns:
+        True if a rebuild was started
+    """
+    global _checked_version
+    if not version or version == _checked_version:
+        return False
+    if _failed_at is not None and time.monotonic() - _failed_at < SNAPSHOT_RETRY_INTERVAL:
+        return False
+    try:
+        if snapshot_version(path) == version:
+            _checked_version = version
+            return False
+    except sqlite3.Error:
+        pass  # Corrupt or partial file: rebuild it
+    if not _rebuild_lock.acquire(blocking=False):
+        return False  # Already rebuilding
+
+    def rebuild():
+        global _checked_version, _failed_at
+        try:
+            build_snapshot_from_database(version, path)
+            _checked_version, _failed_at = version, None
+            print(f"✅ Search snapshot rebuilt for dataset version {version}")
+        except Exception as e:
+            _failed_at = time.monotonic()
+            print(f"Failed to rebuild search snapshot: {e}")
+        finally:
+            _rebuild_lock.release()
+
+    threading.Thread(target=rebuild, name="snapshot-rebuild", daemon=True).start()
+    return True
+
+def _match_expression(normalized_query: str, use_phrase: bool, excluded: List[str] = ()) -> str:
+    """FTS5 MATCH expression: every word must appear, phrase hits rank via bm25."""
+    words = [w.replace('"', "") for w in normalized_query.split()]
+    terms = " AND ".join(f'"{w}"' for w in words)
+    if use_phrase:
+        terms = f'"{" ".join(words)}" OR ({terms})'
+    for term in excluded:
+        terms = f'({terms}) NOT "{term}"'
+    return terms
+
+def search_snapshot(query: str, top_k: int = 10, speaker_filter: str = None,
+                    path: str = SNAPSHOT_PATH) -> List[dict]:
+    """
+    Search the local snapshot, returning results in the same format as search_quotes.
+    Query syntax is parsed like search_quotes does: field prefixes and -exclusions
+    filter the results, while quoted phrases and OR fall back to requiring every word.
+    """
+    from app.search_core import normalize_query, is_phrase_query, rank_rows
+    from app.query_syntax import parse_query
+
+    conn = _connection(path)
+    if conn is None:
+        raise FileNotFoundError(f"Search snapshot not found: {path}")
+
+    parsed = parse_query(query)
+    if parsed.speaker:
+        if speaker_filter and speaker_filter.lower() != parsed.speaker:
+            return []  # speaker:x contradicts the speaker filter
+        speaker_filter = parsed.speaker
+    query = parsed.text
+    normalized_query = normalize_query(query)
+    if not normalized_query:
+        return []
+    use_phrase = is_phrase_query(query)
+    # websearch keeps -word and -"phrase" exclusions already normalized
+    excluded = [term.strip('"') for term in EXCLUSION_RE.findall(parsed.websearch)]
+
+    sql = """
+        SELECT q.id, q.episode_id, q.timestamp_sec, q.speaker, q.text,
+               q.episode_name, q.spotify_url, -bm25(quotes_fts) AS score
+        FROM quotes_fts
+        JOIN quotes q ON q.id = quotes_fts.rowid
+        WHERE quotes_fts MATCH ?
+    """
+    params: list = [_match_expression(normalized_query, use_phrase, excluded)]
+    if speaker_filter:
+        sql += " AND q.speaker = ?"
+        params.append(speaker_filter.lower())
+    if parsed.episode:
+        sql += " AND q.episode_id = ?"
+        params.append(parsed.episode)
+    for column, values in (("speaker", parsed.excluded_speakers), ("episode_id", parsed.excluded_episodes)):
+        if values:
+            sql += f" AND q.{column} NOT IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+    sql += " ORDER BY bm25(quotes_fts), q.timestamp_sec LIMIT ?"
+    params.append(top_k * 2)
+
+    rows = []
+    for row in conn.execute(sql, params):
+        # Squash bm25 into 0..1 like ts_rank_cd's normalization 32, so the
+        # exact-match tiers in rank_rows keep working unchanged
+        score = max(row["score"], 0.0)
+        rank = score / (score + 1)
+        rows.append(SimpleNamespace(**{k: row[k] for k in row.keys() if k != "score"},
+                                    phrase_rank=rank, word_rank=rank))
+    return rank_rows(rows, query, use_phrase)[:top_k]
+
+def snapshot_stats(path: str = SNAPSHOT_PATH) -> dict:
+    """Corpus statistics from the snapshot, shaped like get_stats()."""
+    conn = _connection(path)
+    if conn is None:
+        raise FileNotFoundError(f"Search snapshot not found: {path}")
+    row = conn.execute("SELECT COUNT(*) AS total_quotes, COUNT(DISTINCT episode_id) AS unique_episodes FROM quotes").fetchone()
+    episodes = [r[0] for r in conn.execute("SELECT DISTINCT episode_id FROM quotes ORDER BY episode_id")]
+    return {
+        "total_quotes": row["total_quotes"],
+        "unique_episodes": row["unique_episodes"],
+        "episodes": episodes,
+    }
@@ -0,0 +1,177 @@
+"""
+"Did you mean" spelling correction.
+The importer stores word frequencies for the corpus in the vocabulary table;
+the API loads them into a symmetric-delete (SymSpell-style) index, where every
+word is stored under the strings obtained by deleting up to max_distance of its
+characters. A misspelling shares a delete with its correction, so a lookup is a
+handful of dict probes plus an edit-distance check on the few candidates.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+# Words seen fewer times than this are never offered as corrections
+SPELLING_MIN_FREQUENCY = int(os.getenv("SPELLING_MIN_FREQUENCY", "2"))
+# Largest edit distance corrected (words of 4 letters or fewer allow only 1)
+SPELLING_MAX_DISTANCE = 2
+# Deletes are generated from this many leading characters only, which bounds
+# index size; candidates are still verified against the whole word
+SPELLING_PREFIX_LENGTH = 7
+# Seconds to wait before retrying a failed rebuild (refresh_if_stale runs per search)
+SPELLING_RETRY_INTERVAL = float(os.getenv("SPELLING_RETRY_INTERVAL", "60"))
+
+# Word frequencies for the whole corpus, computed inside PostgreSQL. 'simple'
+# keeps words unstemmed; hyphenated compounds are dropped because
+# normalize_query splits them into their parts anyway.
+VOCABULARY_SQL = r"""
+    SELECT word, nentry AS frequency
+    FROM ts_stat('SELECT to_tsvector(''simple'', text) FROM quotes')
+    WHERE word ~ '^\w+$'
+"""
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions), or max_distance + 1 if larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by deleting up to max_distance characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - results
+        results |= frontier
+    return results
+
+class SpellingIndex:
+    """Symmetric-delete index over a word -> frequency vocabulary."""
+
+    def __init__(self, vocabulary: Dict[str, int], min_frequency: int = SPELLING_MIN_FREQUENCY,
+                 max_distance: int = SPELLING_MAX_DISTANCE, prefix_length: int = SPELLING_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.vocabulary = {w: f for w, f in vocabulary.items() if f >= min_frequency}
+        self._deletes: Dict[str, List[str]] = {}
+        for word in self.vocabulary:
+            for variant in deletes(word[:prefix_length], max_distance):
+                self._deletes.setdefault(variant, []).append(word)
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def correct_word(self, word: str) -> str:
+        """Closest known word (most frequent on ties), or word itself if none is close enough."""
+        if word in self.vocabulary or len(word) < 3 or not word.isalpha():
+            return word
+        max_distance = 1 if len(word) <= 4 else self.max_distance
+        best, best_key = word, None
+        for variant in deletes(word[:self.prefix_length], max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                key = (distance, -self.vocabulary[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        return best
+
+    def correct(self, normalized_query: str) -> Optional[str]:
+        """Corrected query, or None if every word is already known (or uncorrectable)."""
+        words = normalized_query.split()
+        corrected = [self.correct_word(w) for w in words]
+        return " ".join(corrected) if corrected != words else None
+
+def load_vocabulary(conn) -> Dict[str, int]:
+    """Vocabulary stored by the importer, computed on the fly if the table is empty."""
+    from sqlalchemy import text
+
+    rows = []
+    # The table only exists once migration 4 has run
+    if conn.execute(text("SELECT to_regclass('vocabulary') IS NOT NULL")).scalar():
+        rows = conn.execute(text("SELECT word, frequency FROM vocabulary")).fetchall()
+    if not rows:
+        rows = conn.execute(text(VOCABULARY_SQL)).fetchall()
+    return {row.word: row.frequency for row in rows}
+
+def refresh_vocabulary(conn):
+    """Recompute the vocabulary table from the quotes corpus (run by the importer)."""
+    from sqlalchemy import text
+
+    conn.execute(text("DELETE FROM vocabulary"))
+    conn.execute(text(f"INSERT INTO vocabulary (word, frequency) {VOCABULARY_SQL}"))
+
+_index: Optional[SpellingIndex] = None
+_index_version: Optional[str] = None
+_rebuild_lock = threading.Lock()
+# When the last rebuild failed (monotonic seconds)
+_failed_at: Optional[float] = None
+
+def refresh_if_stale(version: Optional[str]) -> bool:
+    """
+    Reload the index in a background thread if it was built for another version.
+
+    Returns:
+        True if a rebuild was started
+    """
+    if not version or version == _index_version:
+        return False
+    if _failed_at is not None and time.monotonic() - _failed_at < SPELLING_RETRY_INTERVAL:
+        return False
+    if not _rebuild_lock.acquire(blocking=False):
+        return False  # Already rebuilding
+
+    def rebuild():
+        global _index, _index_version, _failed_at
+        try:
+            from app.database import get_read_connection
+            with get_read_connection() as conn:
+                vocabulary = load_vocabulary(conn)
+            index = SpellingIndex(vocabulary)
+            _index, _index_version, _failed_at = index, version, None
+            print(f"✅ Spelling index rebuilt with {len(index):,} words for dataset version {version}")
+        except Exception as e:
+            _failed_at = time.monotonic()
+            print(f"Failed to rebuild spelling index: {e}")
+        finally:
+            _rebuild_lock.release()
+
+    threading.Thread(target=rebuild, name="spelling-rebuild", daemon=True).start()
+    return True
+
+def is_current(version: Optional[str]) -> bool:
+    """True once the index has been built for version (suggestions are final and may be cached)."""
+    return _index is not None and version is not None and version == _index_version
+
+def word_frequency(word: str) -> Optional[int]:
+    """Corpus frequency of a normalized word (0 if rare or unknown), or None while the index is loading."""
+    index = _index
+    if index is None:
+        return None
+    return index.vocabulary.get(word, 0)
+
+def suggest_correction(query: str) -> Optional[str]:
+    """Corrected form of a raw query, or None (also while the index is still loading)."""
+    from app.query_syntax import parse_query
+    from app.search_core import normalize_query
+
+    index = _index
+    if index is None:
+        return None
+    parsed = parse_query(query)
+    if parsed.structured or parsed.speaker:
+        return None  # Rewriting operators and field prefixes would change the query's meaning
+    return index.correct(normalize_query(query))
@@ -0,0 +1,130 @@
+"""
+Static file serving for the built React frontend.
+index.html is held in memory; hashed Vite assets are served from their
+precompressed .br/.gz variants with far-future immutable caching.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.compression import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Vite content-hashes everything under assets/, so those URLs never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# index.html must always be revalidated so new deploys are picked up
+INDEX_CACHE_CONTROL = "no-cache"
+# Unhashed files copied from public/ (images, robots.txt)
+PUBLIC_CACHE_CONTROL = "public, max-age=3600"
+
+# Precompressed variants in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+class IndexPage:
+    """index.html loaded once, with its compressed variants kept in memory."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            body = f.read()
+        self.bodies: Dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, 9)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        # Each encoding is a different byte sequence, so each gets its own strong ETag
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etags = {encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+                      for encoding in self.bodies}
+
+    def negotiate(self, request_headers: Headers) -> str:
+        """Best encoding of the page the client accepts."""
+        accepted = accepted_encodings(request_headers)
+        for encoding, _ in PRECOMPRESSED:
+            if encoding in accepted and encoding in self.bodies:
+                return encoding
+        return "identity"
+
+    def response(self, request_headers: Headers) -> Response:
+        """Serve the page, honouring If-None-Match and Accept-Encoding."""
+        encoding = self.negotiate(request_headers)
+        etag = self.etags[encoding]
+        headers = {"ETag": etag, "Cache-Control": INDEX_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if_none_match = request_headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.bodies[encoding], media_type="text/html", headers=headers)
+
+class SPAStaticFiles(StaticFiles):
+    """StaticFiles with precompressed assets, immutable caching and SPA fallback to index.html."""
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory, html=True)
+        index_path = os.path.join(directory, "index.html")
+        self.index = IndexPage(index_path) if os.path.isfile(index_path) else None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.index is not None and path in (".", "", "index.html"):
+            return self.index.response(Headers(scope=scope))
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            # Unknown non-API paths are client-side routes: serve the app shell.
+            # A missing hashed asset (stale build) must stay a 404, not become HTML.
+            if (exc.status_code != 404 or self.index is None
+                    or path.startswith(("api/", "assets/"))):
+                raise
+            return self.index.response(Headers(scope=scope))
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        is_asset = os.path.basename(os.path.dirname(full_path)) == "assets"
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL if is_asset else PUBLIC_CACHE_CONTROL}
+
+        variant = self._precompressed_variant(str(full_path), request_headers)
+        if variant:
+            encoding, variant_path, variant_stat = variant
+            media_type, _ = mimetypes.guess_type(str(full_path))
+            headers["Content-Encoding"] = encoding
+            headers["Vary"] = "Accept-Encoding"
+            response = FileResponse(variant_path, status_code=status_code, stat_result=variant_stat,
+                                    media_type=media_type, headers=headers)
+        else:
+            if self._has_precompressed_variant(str(full_path)):
+                # Caches must not hand this identity body to clients that accept br/gzip
+                headers["Vary"] = "Accept-Encoding"
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return Response(status_code=304, headers={
+                k: v for k, v in response.headers.items()
+                if k in ("etag", "cache-control", "content-encoding", "vary", "last-modified")
+            })
+        return response
+
+    def _has_precompressed_variant(self, full_path: str) -> bool:
+        return any(os.path.isfile(full_path + extension) for _, extension in PRECOMPRESSED)
+
+    def _precompressed_variant(self, full_path: str, request_headers: Headers) -> Optional[Tuple[str, str, os.stat_result]]:
+        accepted = accepted_encodings(request_headers)
+        for encoding, extension in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(full_path + extension)
+            except OSError:
+                continue
+            if stat.S_ISREG(variant_stat.st_mode):
+                return encoding, full_path + extension, variant_stat
+        return None
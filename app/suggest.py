@@ -0,0 +1,168 @@
+"""
+Search-as-you-type suggestions from an in-memory prefix index.
+Candidates are frequent word n-grams from the corpus plus popular queries
+from search_log, weighted by frequency. Lookups are a binary search over a
+sorted phrase array (with the best completions of short prefixes precomputed),
+so they never touch the database. The index is rebuilt in the background
+whenever the dataset version changes.
+"""
+import bisect
+import heapq
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# Longest corpus n-gram offered as a completion (words)
+SUGGEST_MAX_NGRAM = int(os.getenv("SUGGEST_MAX_NGRAM", "3"))
+# Corpus n-grams seen fewer times than this are not suggested
+SUGGEST_MIN_NGRAM_COUNT = int(os.getenv("SUGGEST_MIN_NGRAM_COUNT", "3"))
+# Cap on phrases kept in the index (highest weights win)
+SUGGEST_MAX_PHRASES = int(os.getenv("SUGGEST_MAX_PHRASES", "100000"))
+# A past search counts this many times as much as a corpus occurrence
+SUGGEST_QUERY_WEIGHT = float(os.getenv("SUGGEST_QUERY_WEIGHT", "5"))
+# How far back popular queries are taken from search_log (days)
+SUGGEST_QUERY_LOOKBACK_DAYS = int(os.getenv("SUGGEST_QUERY_LOOKBACK_DAYS", "90"))
+# Most suggestions returned for one prefix
+SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", "10"))
+# Prefixes up to this many characters have their completions precomputed
+SUGGEST_PRECOMPUTE_DEPTH = 3
+
+# N-grams starting or ending with one of these make poor completions
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from had has have he her his i if in is it its
+    me my no not of on or our she so that the their them then there they this to
+    up was we were what when who will with you your
+""".split())
+
+class SuggestionIndex:
+    """Sorted phrase array with weights; returns the heaviest phrases for a prefix."""
+
+    def __init__(self, weights: Dict[str, float], max_results: int = SUGGEST_MAX_RESULTS,
+                 precompute_depth: int = SUGGEST_PRECOMPUTE_DEPTH):
+        self.max_results = max_results
+        self.precompute_depth = precompute_depth
+        self.phrases: List[str] = sorted(weights)
+        self.weights: List[float] = [weights[p] for p in self.phrases]
+        # Short prefixes match huge ranges, so their best completions are computed once
+        self._top: Dict[str, List[int]] = {}
+        for depth in range(1, precompute_depth + 1):
+            groups: Dict[str, List[int]] = {}
+            for i, phrase in enumerate(self.phrases):
+                if len(phrase) >= depth:
+                    groups.setdefault(phrase[:depth], []).append(i)
+            for prefix, indexes in groups.items():
+                self._top[prefix] = self._best(indexes, max_results)
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def _best(self, indexes: Iterable[int], limit: int) -> List[int]:
+        # Heaviest first; ties go to the alphabetically earlier phrase
+        return heapq.nlargest(limit, indexes, key=lambda i: (self.weights[i], -i))
+
+    def lookup(self, prefix: str, limit: int = None) -> List[dict]:
+        """Best completions for an already-normalized prefix."""
+        limit = min(limit or self.max_results, self.max_results)
+        if not prefix:
+            return []
+        if len(prefix) <= self.precompute_depth:
+            indexes = self._top.get(prefix, [])[:limit]
+        else:
+            lo = bisect.bisect_left(self.phrases, prefix)
+            hi = bisect.bisect_left(self.phrases, prefix + "\U0010ffff", lo)
+            indexes = self._best(range(lo, hi), limit)
+        return [{"text": self.phrases[i], "weight": self.weights[i]} for i in indexes]
+
+def count_ngrams(texts: Iterable[str], max_n: int = SUGGEST_MAX_NGRAM) -> Counter:
+    """Count word n-grams (1..max_n) in normalized texts, skipping stopword edges."""
+    counts = Counter()
+    for text in texts:
+        words = text.split()
+        for n in range(1, max_n + 1):
+            for i in range(len(words) - n + 1):
+                first, last = words[i], words[i + n - 1]
+                if first in STOPWORDS or last in STOPWORDS:
+                    continue
+                if n == 1 and len(first) < 3:
+                    continue
+                counts[" ".join(words[i:i + n])] += 1
+    return counts
+
+def build_weights(ngram_counts: Counter, query_counts: Dict[str, int],
+                  min_count: int = SUGGEST_MIN_NGRAM_COUNT, max_phrases: int = SUGGEST_MAX_PHRASES) -> Dict[str, float]:
+    """Merge corpus n-gram and past-query frequencies into phrase weights."""
+    weights: Dict[str, float] = {
+        phrase: float(count) for phrase, count in ngram_counts.items() if count >= min_count
+    }
+    for query, count in query_counts.items():
+        if query:
+            weights[query] = weights.get(query, 0.0) + count * SUGGEST_QUERY_WEIGHT
+    if len(weights) > max_phrases:
+        weights = dict(heapq.nlargest(max_phrases, weights.items(), key=lambda item: item[1]))
+    return weights
+
+def build_index_from_database() -> SuggestionIndex:
+    """Count n-grams over the corpus and popular queries from search_log."""
+    from sqlalchemy import text
+    from app.database import get_read_connection
+    from app.search_core import normalize_query
+
+    with get_read_connection() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=5000).execute(text("SELECT text FROM quotes"))
+        ngram_counts = count_ngrams(normalize_query(row.text) for row in result)
+        query_counts = Counter()
+        for row in conn.execute(text(f"""
+            SELECT LOWER(query) AS query, COUNT(*) AS searches
+            FROM search_log
+            WHERE created_at >= NOW() - INTERVAL '{SUGGEST_QUERY_LOOKBACK_DAYS} days'
+            GROUP BY LOWER(query)
+            HAVING COUNT(*) >= 2
+            ORDER BY searches DESC
+            LIMIT 10000
+        """)):
+            query_counts[normalize_query(row.query)] += row.searches
+    return SuggestionIndex(build_weights(ngram_counts, query_counts))
+
+_index: Optional[SuggestionIndex] = None
+_index_version: Optional[str] = None
+_rebuild_lock = threading.Lock()
+
+def refresh_if_stale(version: Optional[str]) -> bool:
+    """
+    Rebuild the index in a background thread if it was built for another version.
+
+    Returns:
+        True if a rebuild was started
+    """
+    if not version or version == _index_version:
+        return False
+    if not _rebuild_lock.acquire(blocking=False):
+        return False  # Already rebuilding
+
+    def rebuild():
+        global _index, _index_version
+        try:
+            index = build_index_from_database()
+            _index, _index_version = index, version
+            print(f"✅ Suggestion index rebuilt with {len(index):,} phrases for dataset version {version}")
+        except Exception as e:
+            print(f"Failed to rebuild suggestion index: {e}")
+        finally:
+            _rebuild_lock.release()
+
+    threading.Thread(target=rebuild, name="suggest-rebuild", daemon=True).start()
+    return True
+
+def is_current(version: Optional[str]) -> bool:
+    """True once the index has been built for version (answers may be cached)."""
+    return _index is not None and version is not None and version == _index_version
+
+def suggest(prefix: str, limit: int = None) -> List[dict]:
+    """Completions for a raw prefix (empty until the first index build finishes)."""
+    from app.search_core import normalize_query
+
+    index = _index
+    if index is None:
+        return []
+    return index.lookup(normalize_query(prefix), limit)
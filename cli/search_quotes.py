@@ -1,31 +1,46 @@
 # Terminal search tool for quick use.
+import json
 import sys
+import time
 from pathlib import Path
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# Only the search path is imported up front; profiling loads on demand
 from app.search_core import search_quotes
 
-def main():
-    """Search quotes from command line and display formatted results."""
-    if len(sys.argv) < 2:
-        print("Usage: uv run python cli/search_quotes.py \"quote here\" [speaker]")
-        print("Speakers: ricky, steve, karl")
-        raise SystemExit(1)
+USAGE = """Usage:
+  uv run python cli/search_quotes.py "quote here" [speaker] [--top=N] [--profile] [--profile-dump=cprofile|pyinstrument]
+  uv run python cli/search_quotes.py --repl [speaker] [--top=N]
+  uv run python cli/search_quotes.py --batch[=FILE] [--workers=N] [--top=N]   (FILE defaults to stdin)
+Speakers: ricky, steve, karl"""
+
+VALID_SPEAKERS = ["ricky", "steve", "karl"]
+
+# Concurrent searches in batch mode (keep at or below DB_READ_POOL_SIZE)
+DEFAULT_BATCH_WORKERS = 4
 
-    query = sys.argv[1]
-    speaker_filter = sys.argv[2].lower() if len(sys.argv) > 2 else None
-    
-    # Validate speaker
-    valid_speakers = ["ricky", "steve", "karl"]
-    if speaker_filter and speaker_filter not in valid_speakers:
-        print(f"Invalid speaker. Must be one of: {', '.join(valid_speakers)}")
+def option(args, name, default=None):
+    """Value of a --name=value option (default if absent)."""
+    for arg in args:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+def validate_speaker(speaker):
+    """Return the lowercased speaker, or exit if it isn't a known one."""
+    if speaker is None:
+        return None
+    speaker = speaker.lower()
+    if speaker not in VALID_SPEAKERS:
+        print(f"Invalid speaker. Must be one of: {', '.join(VALID_SPEAKERS)}", file=sys.stderr)
         raise SystemExit(1)
-    
-    results = search_quotes(query, top_k=10, speaker_filter=speaker_filter)
+    return speaker
 
+def print_results(query, results):
+    """Display formatted results."""
     if not results:
         print("No matches found.")
         return
@@ -38,5 +53,158 @@ def main():
             print(f"  Spotify: {r['spotify_url']}")
         print()
 
+def warm_up():
+    """Open a pooled read connection now so the first query doesn't pay for it."""
+    from sqlalchemy import text
+    from app.database import get_read_connection
+
+    with get_read_connection() as conn:
+        conn.execute(text("SELECT 1"))
+
+def run_repl(speaker_filter, top_k):
+    """Interactive loop over one warm connection pool."""
+    print("Type a quote to search. Commands: :speaker NAME (blank to clear), :top N, :quit")
+    start = time.perf_counter()
+    warm_up()
+    print(f"🔌 Connected in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    while True:
+        prompt = f"search[{speaker_filter}]> " if speaker_filter else "search> "
+        try:
+            line = input(prompt).strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return
+        if not line:
+            continue
+        if line in (":quit", ":q", ":exit"):
+            return
+        if line.startswith(":speaker"):
+            name = line[len(":speaker"):].strip().lower() or None
+            if name and name not in VALID_SPEAKERS:
+                print(f"Invalid speaker. Must be one of: {', '.join(VALID_SPEAKERS)}")
+            else:
+                speaker_filter = name
+            continue
+        if line.startswith(":top"):
+            value = line[len(":top"):].strip()
+            if value.isdigit() and int(value) > 0:
+                top_k = int(value)
+            else:
+                print("Usage: :top N")
+            continue
+
+        start = time.perf_counter()
+        try:
+            results = search_quotes(line, top_k=top_k, speaker_filter=speaker_filter)
+        except Exception as e:
+            print(f"❌ Search failed: {e}")
+            continue
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print_results(line, results)
+        print(f"⏱️  {len(results)} results in {elapsed_ms:.1f} ms")
+
+def read_batch(source):
+    """
+    Yield (query, speaker) pairs from a file or stdin ("-").
+    One query per line; an optional speaker may follow a tab.
+    """
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            query, _, speaker = line.partition("\t")
+            yield query.strip(), speaker.strip().lower() or None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def run_batch(source, workers, top_k):
+    """Search every query over a bounded thread pool and write JSON Lines to stdout, in input order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run_one(item):
+        query, speaker = item
+        start = time.perf_counter()
+        record = {"query": query, "speaker": speaker}
+        try:
+            if speaker and speaker not in VALID_SPEAKERS:
+                raise ValueError(f"invalid speaker: {speaker}")
+            record["results"] = search_quotes(query, top_k=top_k, speaker_filter=speaker)
+        except Exception as e:
+            record["error"] = str(e)
+        record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return record
+
+    start = time.perf_counter()
+    count = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for record in pool.map(run_one, read_batch(source)):
+            count += 1
+            failed += "error" in record
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {count} queries in {elapsed:.2f}s ({failed} failed)", file=sys.stderr)
+    if failed:
+        raise SystemExit(2)
+
+def main():
+    """Search quotes from command line and display formatted results."""
+    args = sys.argv[1:]
+    options = [a for a in args if a.startswith("--")]
+    args = [a for a in args if not a.startswith("--")]
+
+    top_value = option(options, "top", "10")
+    if not top_value.isdigit() or int(top_value) < 1:
+        print("--top must be a positive integer", file=sys.stderr)
+        raise SystemExit(1)
+    top_k = int(top_value)
+
+    if "--repl" in options:
+        run_repl(validate_speaker(args[0] if args else None), top_k)
+        return
+
+    if "--batch" in options or option(options, "batch"):
+        workers = option(options, "workers", str(DEFAULT_BATCH_WORKERS))
+        if not workers.isdigit() or int(workers) < 1:
+            print("--workers must be a positive integer", file=sys.stderr)
+            raise SystemExit(1)
+        run_batch(option(options, "batch", "-"), int(workers), top_k)
+        return
+
+    # --profile / --profile-dump=FORMAT may appear anywhere after the script name
+    profile = "--profile" in options
+    profile_dump = option(options, "profile-dump")
+    if profile_dump:
+        profile = True
+
+    if not args:
+        print(USAGE)
+        raise SystemExit(1)
+
+    if profile:
+        from app.profiling import SearchProfiler, DUMP_FORMATS, print_report
+    if profile_dump and profile_dump not in DUMP_FORMATS:
+        print(f"Invalid profile dump format. Must be one of: {', '.join(DUMP_FORMATS)}")
+        raise SystemExit(1)
+
+    query = args[0]
+    speaker_filter = validate_speaker(args[1] if len(args) > 1 else None)
+
+    profiler = SearchProfiler(dump_format=profile_dump) if profile else None
+    if profiler:
+        results = profiler.run(search_quotes, query, top_k=top_k, speaker_filter=speaker_filter)
+    else:
+        results = search_quotes(query, top_k=top_k, speaker_filter=speaker_filter)
+
+    if profiler:
+        print()
+        print_report(profiler.report())
+
+    print_results(query, results)
+
 if __name__ == "__main__":
     main()
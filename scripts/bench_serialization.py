@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark search response serialization and compression.
+Compares FastAPI's default path (jsonable_encoder + json) with the
+FastJSONResponse path, and reports payload size raw/gzip/brotli.
+
+Usage:
+    python scripts/bench_serialization.py [top_k] [iterations]
+"""
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder
+from app.responses import dumps, orjson
+
+def sample_response(top_k: int) -> dict:
+    """Build a search response shaped like the real API output."""
+    results = []
+    for i in range(top_k):
+        results.append({
+            "episode_id": f"xfm-s{i % 4 + 1}e{i % 12 + 1}",
+            "episode_name": f"S0{i % 4 + 1}E{i % 12 + 1:02d} | Remastered",
+            "timestamp_sec": 60 * i + 7,
+            "timestamp_hms": f"00:{i % 60:02d}:07",
+            "speaker": ("karl", "ricky", "steve")[i % 3],
+            "text": "I could eat a knob at night, I'm not saying I would, but if I was hungry, you know, I'd have a go.",
+            "spotify_url": "https://open.spotify.com/episode/34mXWuUCEa2UzTft5vxxLp?si=9caac35d12284346",
+            "rank": 0.123456789 * (top_k - i),
+        })
+    return {"query": "knob at night", "count": len(results), "results": results}
+
+def bench(label: str, fn, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<40} {per_call_us:>10.1f} µs/response")
+
+def main():
+    top_k = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    body = sample_response(top_k)
+
+    print(f"\nSerialization (top_k={top_k}, {iterations} iterations, orjson={'yes' if orjson else 'no'})")
+    print("=" * 64)
+    bench("jsonable_encoder + json.dumps (default)",
+          lambda: json.dumps(jsonable_encoder(body)).encode("utf-8"), iterations)
+    bench("FastJSONResponse dumps", lambda: dumps(body), iterations)
+
+    raw = dumps(body)
+    print(f"\nPayload size")
+    print("=" * 64)
+    print(f"{'raw':<40} {len(raw):>10,} bytes")
+    print(f"{'gzip (level 6)':<40} {len(gzip.compress(raw, 6)):>10,} bytes")
+    try:
+        import brotli
+        print(f"{'brotli (quality 4)':<40} {len(brotli.compress(raw, quality=4)):>10,} bytes")
+    except ImportError:
+        print(f"{'brotli':<40} {'not installed':>10}")
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.database import get_connection, init_database
+from app.dataset import compute_version, record_dataset_version
+from app.snapshot import build_snapshot, SNAPSHOT_PATH
+from app.spelling import refresh_vocabulary
+from app.postings import refresh_postings
+from app import bm25
 
 CSV_PATH = Path("out/quotes.csv")
 
@@ -36,8 +41,9 @@ def main():
         print("Make sure DATABASE_URL environment variable is set")
         sys.exit(1)
     
-    # Skip schema initialization - use existing table
-    print("ℹ️  Using existing database schema")
+    # Make sure the schema is current (no-op if already migrated)
+    version = init_database()
+    print(f"✅ Database schema at version {version}")
     
     # Clear existing data before importing
     print("🗑️  Clearing existing quotes...")
@@ -95,8 +101,30 @@ def main():
             if (i + BATCH_SIZE) % 10000 == 0 or i + BATCH_SIZE >= len(rows):
                 print(f"   Inserted {min(i + BATCH_SIZE, len(rows)):,} quotes...")
     
-    # Skip full-text search index for now
-    print("ℹ️  Skipping full-text search index (will be created by app)")
+    # Read the rows back with their new ids: results and cursors expose ids, so a
+    # re-import of identical content must still change the version
+    with get_connection() as conn:
+        from sqlalchemy import text
+        rows = [dict(row._mapping) for row in conn.execute(text("""
+            SELECT id, episode_id, timestamp_sec, speaker, text, episode_name, spotify_url
+            FROM quotes ORDER BY id
+        """))]
+    
+    # Record the dataset version so API caches (ETags) are invalidated
+    version = compute_version(rows)
+    with get_connection() as conn:
+        # Derived tables first: the new version tells the API to reload them
+        refresh_vocabulary(conn)
+        postings = refresh_postings(conn)
+        bm25.refresh_stats(conn)
+        record_dataset_version(conn, version)
+        conn.commit()
+    print(f"🏷️  Dataset version: {version}")
+    print(f"📇 Precomputed {postings:,} postings for frequent terms")
+    
+    # Refresh the local fallback snapshot used when PostgreSQL is unavailable
+    build_snapshot(rows, version)
+    print(f"📦 Search snapshot written to {SNAPSHOT_PATH}")
     
     # Get final statistics
     with get_connection() as conn:
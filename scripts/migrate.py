@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Apply pending database schema migrations.
+Run once per deploy, before starting the app (Railway's pre-deploy step);
+index builds on existing tables run CONCURRENTLY so they don't block reads or
+writes.
+
+Usage:
+    python scripts/migrate.py            # apply pending migrations
+    python scripts/migrate.py --no-wait  # skip if another process is migrating (app boot)
+    python scripts/migrate.py --status   # show current and latest version
+"""
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Load environment variables from .env file
+load_dotenv()
+
+from app.migrations import MIGRATIONS, apply_migrations, check_schema
+
+def main():
+    try:
+        current, latest = check_schema()
+    except Exception as e:
+        print(f"❌ Database connection failed: {e}")
+        sys.exit(1)
+
+    if "--status" in sys.argv[1:]:
+        print(f"Schema version: {current} (latest: {latest})")
+        for migration in MIGRATIONS:
+            marker = "✅" if migration.version <= current else "⏳"
+            print(f"  {marker} {migration.version}: {migration.description}")
+        sys.exit(0 if current >= latest else 1)
+
+    if current >= latest:
+        print(f"✅ Schema is up to date (version {current})")
+        return
+    version = apply_migrations(wait="--no-wait" not in sys.argv[1:])
+    if version is None:
+        # A replica booting mid-deploy must not wait out a long concurrent index build
+        print("⏭️  Another process is applying migrations, not waiting for it")
+        return
+    print(f"✅ Schema migrated from version {current} to {version}")
+
+if __name__ == "__main__":
+    main()
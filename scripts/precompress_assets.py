@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Write .br and .gz variants next to compressible files in dist/ after a Vite build,
+so the app can serve them without compressing on every request.
+
+Usage:
+    python scripts/precompress_assets.py [dist_dir]
+"""
+import gzip
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map", ".xml"}
+MIN_SIZE = 1024
+
+def main():
+    dist = Path(sys.argv[1] if len(sys.argv) > 1 else "dist")
+    if not dist.is_dir():
+        print(f"❌ {dist} not found. Run 'npm run build' first.")
+        sys.exit(1)
+    if brotli is None:
+        print("⚠️  brotli not installed, writing .gz variants only")
+
+    count = 0
+    saved = 0
+    for path in sorted(dist.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_SIZE:
+            continue
+        variants = {".gz": gzip.compress(data, 9)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+        for extension, compressed in variants.items():
+            # Only keep variants that are actually smaller
+            if len(compressed) < len(data):
+                path.with_name(path.name + extension).write_bytes(compressed)
+                saved += len(data) - len(compressed)
+        count += 1
+
+    print(f"✅ Precompressed {count} files ({saved / 1024:.1f} KiB saved across variants)")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Usage:
     python scripts/test_search.py "Try both." karl
     python scripts/test_search.py "try both" karl
     python scripts/test_search.py "knob at night" karl
+    python scripts/test_search.py "knob at night" karl --profile
 """
 
 import sys
@@ -18,12 +19,13 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from app.search_core import search_quotes
+from app.profiling import SearchProfiler, print_report
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def test_search(query: str, speaker: str = None, top_k: int = 10):
+def test_search(query: str, speaker: str = None, top_k: int = 10, profile: bool = False):
     """Test a search query and display results."""
     print(f"\n{'='*80}")
     print(f"Testing search: '{query}'")
@@ -35,7 +37,13 @@ def test_search(query: str, speaker: str = None, top_k: int = 10):
         from app.search_core import normalize_query
         query_normalized = normalize_query(query)
         
-        results = search_quotes(query, top_k=top_k, speaker_filter=speaker)
+        if profile:
+            profiler = SearchProfiler(dump_format="cprofile")
+            results = profiler.run(search_quotes, query, top_k=top_k, speaker_filter=speaker)
+            print_report(profiler.report())
+            print()
+        else:
+            results = search_quotes(query, top_k=top_k, speaker_filter=speaker)
         
         if not results:
             print("❌ No results found.")
@@ -135,22 +143,27 @@ if __name__ == "__main__":
         print("  railway run python scripts/test_search.py 'Try both.' karl")
         sys.exit(1)
     
-    if len(sys.argv) == 1:
+    # --profile prints a stage/function breakdown and writes a .prof file
+    profile = "--profile" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--profile"]
+    
+    if len(args) == 0:
         # Run test suite
         run_test_suite()
-    elif len(sys.argv) == 2:
+    elif len(args) == 1:
         # Single query, no speaker filter
-        query = sys.argv[1]
-        test_search(query)
-    elif len(sys.argv) == 3:
+        query = args[0]
+        test_search(query, profile=profile)
+    elif len(args) == 2:
         # Query with speaker filter
-        query = sys.argv[1]
-        speaker = sys.argv[2].lower()
-        test_search(query, speaker=speaker)
+        query = args[0]
+        speaker = args[1].lower()
+        test_search(query, speaker=speaker, profile=profile)
     else:
         print("Usage:")
         print("  python scripts/test_search.py                    # Run test suite")
         print("  python scripts/test_search.py 'query'           # Search without filter")
         print("  python scripts/test_search.py 'query' speaker  # Search with speaker filter")
+        print("  python scripts/test_search.py 'query' [speaker] --profile  # Profile the search")
         sys.exit(1)
 
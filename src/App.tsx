@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import Header from './components/Header'
 import SearchBar from './components/SearchBar'
 import SpeakerFilter from './components/SpeakerFilter'
@@ -18,8 +18,11 @@ function App() {
   const [query, setQuery] = useState('')
   const [speakerFilter, setSpeakerFilter] = useState('')
   const [results, setResults] = useState<SearchResult[]>([])
+  const [speakerCounts, setSpeakerCounts] = useState<Record<string, number> | undefined>(undefined)
   const [error, setError] = useState<string | null>(null)
   const [clearSearchTrigger, setClearSearchTrigger] = useState(0)
+  // Query the speaker counts belong to (or are being fetched for)
+  const countsQueryRef = useRef<string | null>(null)
 
   // Handle hash routing
   useEffect(() => {
@@ -50,9 +53,14 @@ function App() {
 
     setSearchState('loading')
     setError(null)
+    // Speaker counts ignore the speaker filter, so they only go stale when the query changes
+    if (countsQueryRef.current !== searchQuery) {
+      countsQueryRef.current = null
+      setSpeakerCounts(undefined)
+    }
 
     try {
-      const data = await searchQuotes(searchQuery, 10, speaker)
+      const data = await searchQuotes(searchQuery, 10, speaker, 'fts')
       setResults(data.results)
       setSearchState(data.results.length > 0 ? 'success' : 'empty')
     } catch (err) {
@@ -61,6 +69,26 @@ function App() {
     }
   }, [])
 
+  // Facets cost a full count of the matches, so they're only fetched once the
+  // speaker dropdown is opened
+  const loadSpeakerCounts = useCallback(async () => {
+    if (!query.trim() || countsQueryRef.current === query) return
+
+    countsQueryRef.current = query
+    try {
+      // The search itself was already logged; only the counts are needed here
+      const data = await searchQuotes(query, 1, speakerFilter, 'fts', true, false)
+      if (countsQueryRef.current === query) {
+        setSpeakerCounts(data.facets?.speaker)
+      }
+    } catch (err) {
+      if (countsQueryRef.current === query) {
+        countsQueryRef.current = null
+      }
+      console.error('Failed to load speaker counts:', err)
+    }
+  }, [query, speakerFilter])
+
   // Keyboard shortcuts
   const { searchInputRef } = useKeyboardShortcuts()
 
@@ -74,6 +102,8 @@ function App() {
     setQuery('')
     setSpeakerFilter('')
     setResults([])
+    setSpeakerCounts(undefined)
+    countsQueryRef.current = null
     setError(null)
     setClearSearchTrigger(prev => prev + 1)
   }
@@ -112,6 +142,8 @@ function App() {
             <SpeakerFilter 
               value={speakerFilter}
               onChange={handleSpeakerChange}
+              counts={speakerCounts}
+              onOpen={loadSpeakerCounts}
             />
           </div>
 
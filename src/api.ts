@@ -1,9 +1,11 @@
-import { SearchResponse, StatsResponse } from './types'
+import { SearchMode, SearchResponse, StatsResponse, SuggestResponse } from './types'
 
 // Always use /api prefix since backend routes are /api/*
 const API_BASE = '/api';
 
-export async function searchQuotes(query: string, limit: number = 10, speaker?: string): Promise<SearchResponse> {
+// log = false marks the request as a test search, so follow-up fetches (like
+// facet counts) aren't logged as another search
+export async function searchQuotes(query: string, limit: number = 10, speaker?: string, mode: SearchMode = 'fts', facets: boolean = false, log: boolean = true): Promise<SearchResponse> {
   const params = new URLSearchParams({
     q: query,
     top_k: limit.toString(),
@@ -13,6 +15,18 @@ export async function searchQuotes(query: string, limit: number = 10, speaker?:
     params.append('speaker', speaker);
   }
 
+  if (mode !== 'fts') {
+    params.append('mode', mode);
+  }
+
+  if (facets) {
+    params.append('facets', 'true');
+  }
+
+  if (!log) {
+    params.append('test', 'true');
+  }
+
   const response = await fetch(`${API_BASE}/search?${params}`);
   
   if (!response.ok) {
@@ -22,6 +36,21 @@ export async function searchQuotes(query: string, limit: number = 10, speaker?:
   return response.json();
 }
 
+export async function getSuggestions(prefix: string, limit: number = 8, signal?: AbortSignal): Promise<SuggestResponse> {
+  const params = new URLSearchParams({
+    q: prefix,
+    limit: limit.toString(),
+  });
+
+  const response = await fetch(`${API_BASE}/suggest?${params}`, { signal });
+  
+  if (!response.ok) {
+    throw new Error(`Suggest failed: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
 export async function getStats(): Promise<StatsResponse> {
   const response = await fetch(`${API_BASE}/stats`);
   
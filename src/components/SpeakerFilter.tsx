@@ -1,11 +1,15 @@
 interface SpeakerFilterProps {
   value: string
   onChange: (speaker: string) => void
+  // Matches per speaker for the current search (ignoring the speaker filter)
+  counts?: Record<string, number>
+  // Called when the dropdown opens, so counts can be fetched on demand
+  onOpen?: () => void
 }
 
 import { useState, useRef, useEffect } from 'react'
 
-export default function SpeakerFilter({ value, onChange }: SpeakerFilterProps) {
+export default function SpeakerFilter({ value, onChange, counts, onOpen }: SpeakerFilterProps) {
   const [isOpen, setIsOpen] = useState(false)
   const dropdownRef = useRef<HTMLDivElement>(null)
 
@@ -18,6 +22,14 @@ export default function SpeakerFilter({ value, onChange }: SpeakerFilterProps) {
 
   const selectedSpeaker = speakers.find(s => s.value === value) || speakers[0]
 
+  const countFor = (speaker: typeof speakers[0]) => {
+    if (!counts) return undefined
+    if (speaker.value === '') {
+      return Object.values(counts).reduce((total, n) => total + n, 0)
+    }
+    return counts[speaker.value] ?? 0
+  }
+
   useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
       if (dropdownRef.current && !dropdownRef.current.contains(event.target as Node)) {
@@ -49,7 +61,10 @@ export default function SpeakerFilter({ value, onChange }: SpeakerFilterProps) {
       </label>
       <div className="relative" ref={dropdownRef}>
         <button
-          onClick={() => setIsOpen(!isOpen)}
+          onClick={() => {
+            if (!isOpen) onOpen?.()
+            setIsOpen(!isOpen)
+          }}
           className="flex items-center gap-2 bg-white border border-slate-200 rounded-lg px-3 py-2 text-sm text-slate-700 hover:border-slate-300 hover:bg-slate-50 transition-all duration-200 focus:outline-none focus:ring-2 focus:ring-emerald-500 focus:border-emerald-500 min-w-[140px]"
           aria-label="Filter by speaker"
         >
@@ -80,6 +95,9 @@ export default function SpeakerFilter({ value, onChange }: SpeakerFilterProps) {
               >
                 {renderIcon(speaker)}
                 <span className="flex-1">{speaker.label}</span>
+                {countFor(speaker) !== undefined && (
+                  <span className="text-xs text-slate-400 tabular-nums">{countFor(speaker)!.toLocaleString()}</span>
+                )}
                 {value === speaker.value && (
                   <svg className="h-4 w-4 text-emerald-500" fill="currentColor" viewBox="0 0 20 20">
                     <path fillRule="evenodd" d="M16.707 5.293a1 1 0 010 1.414l-8 8a1 1 0 01-1.414 0l-4-4a1 1 0 011.414-1.414L8 12.586l7.293-7.293a1 1 0 011.414 0z" clipRule="evenodd" />
@@ -1,6 +1,10 @@
 export type SearchState = 'idle' | 'loading' | 'success' | 'empty' | 'error'
 
+// fts: stemmed full-text words; substring: any fragment; wildcard: * and ? patterns
+export type SearchMode = 'fts' | 'substring' | 'wildcard'
+
 export interface SearchResult {
+  id: number
   episode_id: string
   episode_name: string
   timestamp_sec: number
@@ -8,12 +12,47 @@ export interface SearchResult {
   speaker: string
   text: string
   spotify_url: string
+  context?: QuoteContext
+}
+
+export interface ContextLine {
+  timestamp_sec: number
+  timestamp_hms: string
+  speaker: string
+  text: string
+}
+
+export interface QuoteContext {
+  before: ContextLine[]
+  after: ContextLine[]
+}
+
+export interface SearchFacets {
+  speaker: Record<string, number>
+  show: Record<string, number>
+  series: Record<string, number>
 }
 
 export interface SearchResponse {
   query: string
+  // Total matches when facets were requested, otherwise results.length
   count: number
   results: SearchResult[]
+  facets?: SearchFacets
+  // True if count and facets are lower bounds from a capped scan
+  count_estimated?: boolean
+  did_you_mean?: string
+  corrected_query?: string
+}
+
+export interface Suggestion {
+  text: string
+  weight: number
+}
+
+export interface SuggestResponse {
+  query: string
+  suggestions: Suggestion[]
 }
 
 export interface Stats {
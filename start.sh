@@ -6,5 +6,10 @@ echo "Current directory:"
 pwd
 echo "Files in current directory:"
 ls -la
+echo "Applying database migrations..."
+# Railway runs migrations as a pre-deploy step, so this is normally a version check.
+# Refuse to start if migrating fails, but don't wait on another replica's migration
+# (searches fall back until its new tables and indexes exist).
+python scripts/migrate.py --no-wait || { echo "❌ Migrations failed, not starting the server"; exit 1; }
 echo "Trying to start uvicorn..."
 exec python -m uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
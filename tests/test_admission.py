@@ -0,0 +1,47 @@
+# Test token-bucket rate limiting and the concurrency limiter.
+from app.admission import TokenBucketLimiter, ConcurrencyLimiter, retry_after_header, client_address
+
+def test_token_bucket_allows_burst_then_refills():
+    """Test that a client gets its burst, is throttled, then refills."""
+    limiter = TokenBucketLimiter(rate=2, burst=3)
+    assert [limiter.acquire("1.2.3.4", now=100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.acquire("1.2.3.4", now=100.0)
+    assert wait == 0.5
+    assert retry_after_header(wait) == "1"
+    # Other clients are unaffected
+    assert limiter.acquire("5.6.7.8", now=100.0) == 0.0
+    # Half a second later one token is back
+    assert limiter.acquire("1.2.3.4", now=100.5) == 0.0
+
+def test_token_bucket_evicts_least_recent_clients():
+    """Test that the bucket table stays bounded."""
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_clients=2)
+    for ip in ("a", "b", "c"):
+        limiter.acquire(ip, now=0.0)
+    assert list(limiter._buckets) == ["b", "c"]
+
+def test_concurrency_limiter_sheds_when_full():
+    """Test that slots are rejected, not queued, once the limit is reached."""
+    limiter = ConcurrencyLimiter(2)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+
+def test_token_bucket_charges_batch_cost():
+    """Test that a batch takes one token per item, capped at the burst size."""
+    limiter = TokenBucketLimiter(rate=1, burst=5)
+    assert limiter.acquire("a", now=0.0, cost=3) == 0.0
+    assert limiter.acquire("a", now=0.0, cost=3) == 1.0
+    # Larger than the burst: charged the full burst rather than rejected forever
+    assert limiter.acquire("b", now=0.0, cost=50) == 0.0
+    assert limiter.acquire("b", now=0.0) == 1.0
+
+def test_client_address_ignores_spoofed_forwarded_for():
+    """Test that the rate-limit key is the address the trusted proxy appended."""
+    assert client_address("6.6.6.6, 1.2.3.4", "10.0.0.1", trusted_hops=1) == "1.2.3.4"
+    assert client_address("6.6.6.6, 1.2.3.4, 10.0.0.2", "10.0.0.1", trusted_hops=2) == "1.2.3.4"
+    assert client_address("1.2.3.4", "10.0.0.1", trusted_hops=2) == "1.2.3.4"
+    # No header, or no proxy trusted: the socket peer
+    assert client_address(None, "10.0.0.1", trusted_hops=1) == "10.0.0.1"
+    assert client_address("6.6.6.6", "10.0.0.1", trusted_hops=0) == "10.0.0.1"
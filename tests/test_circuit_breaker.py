@@ -0,0 +1,65 @@
+# Test circuit breaker state transitions.
+import time
+from app.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+def test_breaker_opens_after_threshold_and_recovers():
+    """Test closed -> open -> half-open -> closed."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    # Only one trial call at a time
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_failed_trial_reopens():
+    """Test that a failing half-open trial re-opens the breaker."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+def test_released_trial_lets_another_through():
+    """Test that a trial ending without an outcome (e.g. cancelled) doesn't wedge the breaker."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release_trial()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_client_shortened_timeouts_never_trip_the_database_breaker(monkeypatch):
+    """Test that budget_ms timeouts are 504s, while full-budget timeouts still count."""
+    import pytest
+    import app.main as main
+    from app.deadlines import SearchDeadline, SearchTimeout, SEARCH_TIME_BUDGET_MS
+
+    def timing_out_search(*args, **kwargs):
+        raise SearchTimeout()
+
+    monkeypatch.setattr(main, "db_breaker", CircuitBreaker("test", failure_threshold=2, reset_timeout=60))
+    monkeypatch.setattr(main, "search_quotes", timing_out_search)
+    monkeypatch.setattr(main.snapshot, "is_available", lambda: True)
+    monkeypatch.setattr(main.snapshot, "search_snapshot", lambda *args, **kwargs: [])
+    for _ in range(5):
+        with pytest.raises(SearchTimeout):
+            main.run_search("monkey", 5, None, SearchDeadline(1))
+    assert main.db_breaker.state == CLOSED
+
+    for _ in range(2):
+        assert main.run_search("monkey", 5, None, SearchDeadline(SEARCH_TIME_BUDGET_MS)) == ([], False, True)
+    assert main.db_breaker.state == OPEN
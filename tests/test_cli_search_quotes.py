@@ -0,0 +1,8 @@
+# Batch input parsing for the search CLI.
+from cli.search_quotes import read_batch
+
+def test_read_batch_parses_queries_and_optional_speaker(tmp_path):
+    """One query per line, optional tab-separated speaker, blank lines skipped."""
+    path = tmp_path / "queries.txt"
+    path.write_text("monkey news\n\nlittle bit of\tKarl\n", encoding="utf-8")
+    assert list(read_batch(str(path))) == [("monkey news", None), ("little bit of", "karl")]
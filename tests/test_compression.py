@@ -0,0 +1,29 @@
+# Test Accept-Encoding negotiation and ETags on compressed responses.
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from app.compression import CompressionMiddleware, accepted_encodings
+
+def test_accepted_encodings_honours_q_values():
+    """Codings with q=0 are refused, and * only adds codings not refused."""
+    assert accepted_encodings(Headers({"accept-encoding": "gzip, br;q=0"})) == {"gzip"}
+    assert accepted_encodings(Headers({"accept-encoding": "br;q=0.000, gzip;q=0.5"})) == {"gzip"}
+    assert accepted_encodings(Headers({"accept-encoding": "*, gzip;q=0"})) == {"*", "br"}
+
+def test_compressed_response_gets_weak_etag():
+    """A re-encoded body must not keep the identity body's strong ETag."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10)
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse("x" * 100, headers={"ETag": '"abc"'})
+
+    client = TestClient(app)
+    compressed = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == 'W/"abc"'
+    identity = client.get("/text", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"abc"'
@@ -0,0 +1,30 @@
+# Test the chunked NDJSON/CSV export encoders.
+import csv
+import io
+import json
+from app.export import ndjson_chunks, csv_chunks, EXPORT_COLUMNS
+
+ROWS = [
+    {"episode_id": "S1E1", "episode_name": "Test", "timestamp_sec": i, "timestamp_hms": f"00:00:{i:02d}",
+     "speaker": "karl", "text": f'quote "{i}", with comma', "spotify_url": ""}
+    for i in range(5)
+]
+
+def test_ndjson_chunks_groups_rows():
+    """Test that rows are grouped per chunk and each line is one JSON object."""
+    chunks = list(ndjson_chunks(iter(ROWS), chunk_rows=2))
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+
+def test_csv_chunks_writes_header_once():
+    """Test that chunked CSV parses back to the original rows."""
+    chunks = list(csv_chunks(iter(ROWS), chunk_rows=2))
+    assert len(chunks) == 3
+    parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert list(parsed[0].keys()) == EXPORT_COLUMNS
+    assert [r["text"] for r in parsed] == [r["text"] for r in ROWS]
+
+def test_csv_chunks_header_only_when_empty():
+    """Test that an export with no matches is still a valid CSV."""
+    assert b"".join(csv_chunks(iter([]))).decode().strip() == ",".join(EXPORT_COLUMNS)
@@ -0,0 +1,26 @@
+# Test ETag generation and If-None-Match matching.
+from app.http_cache import make_etag, etag_matches
+
+def test_etag_changes_with_version_and_params():
+    """Test that ETags are strong and keyed on version and parameters."""
+    etag = make_etag("abc123", "search", "try both", 5, "karl")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("abc123", "search", "try both", 5, "karl")
+    assert etag != make_etag("def456", "search", "try both", 5, "karl")
+    assert etag != make_etag("abc123", "search", "try both", 5, None)
+
+def test_etag_matches_header_forms():
+    """Test that lists, weak validators and * are honoured."""
+    etag = make_etag("v1", "stats")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+def test_dataset_version_changes_with_ids():
+    """Test that re-importing identical content under new ids changes the version."""
+    from app.dataset import compute_version
+    row = {"episode_id": "xfm-s1e1", "timestamp_sec": 10, "speaker": "karl", "text": "Monkey news"}
+    assert compute_version([{"id": 1, **row}]) == compute_version([{"id": 1, **row}])
+    assert compute_version([{"id": 1, **row}]) != compute_version([{"id": 2, **row}])
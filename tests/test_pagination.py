@@ -0,0 +1,96 @@
+# Test keyset cursors and the candidate cache used by paginated search.
+import pytest
+from app.pagination import (
+    TTLCache, InvalidCursor, sort_candidates, query_fingerprint, encode_cursor, decode_cursor, page_after,
+    encode_token, decode_token,
+)
+
+def _candidates():
+    # Ties on rank are broken by timestamp, then id
+    ranks = [5.0, 2.5, 2.5, 2.5, 1.0, 0.25]
+    return sort_candidates([
+        {"id": i, "rank": rank, "timestamp_sec": 100 - i * 10 if i != 3 else 70}
+        for i, rank in enumerate(ranks)
+    ])
+
+def test_cursor_pages_cover_every_result_once():
+    """Test that following next cursors visits all candidates in order without repeats."""
+    candidates = _candidates()
+    fingerprint = query_fingerprint("monkey news", None)
+    seen, after = [], None
+    while True:
+        page, has_more = page_after(candidates, after, 2)
+        seen += page
+        if not has_more:
+            break
+        after = decode_cursor(encode_cursor(fingerprint, page[-1]), fingerprint)
+    assert [c["id"] for c in seen] == [c["id"] for c in candidates]
+
+def test_cursor_rejects_other_queries_and_garbage():
+    """Test that a cursor only resumes the query it was issued for."""
+    token = encode_cursor(query_fingerprint("monkey", None), {"id": 1, "rank": 1.0, "timestamp_sec": 5})
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, query_fingerprint("monkey", "karl"))
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", query_fingerprint("monkey", None))
+
+def test_ttl_cache_expires_and_evicts():
+    """Test that entries expire after the TTL and the cache stays bounded."""
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.put("a", 1, now=0)
+    assert cache.get("a", now=5) == 1
+    assert cache.get("a", now=11) is None
+    for key in ("b", "c", "d"):
+        cache.put(key, key, now=20)
+    assert cache.get("b", now=21) is None and cache.get("d", now=21) == "d"
+
+def test_token_round_trip():
+    """Test that generic tokens (used by transcript cursors) round-trip and reject junk."""
+    payload = {"e": "xfm-s1e1", "s": None, "t": 120, "i": 42}
+    assert decode_token(encode_token(payload)) == payload
+    with pytest.raises(InvalidCursor):
+        decode_token(encode_token([1, 2]))
+
+def test_pages_fetch_only_as_deep_as_needed(monkeypatch):
+    """Test that the first page ranks a small candidate set and later pages deepen it lazily."""
+    import app.main
+    corpus = [{"id": i, "rank": 1.0 / (i + 1), "timestamp_sec": i} for i in range(45)]
+    depths = []
+
+    def fake_search(q, top_k, speaker, deadline):
+        depths.append(top_k)
+        return corpus[:top_k], False, False
+
+    monkeypatch.setattr(app.main, "run_search", fake_search)
+    monkeypatch.setattr(app.main, "page_candidates", TTLCache(8, 60))
+    seen, after = [], None
+    while True:
+        page, has_more, _, _ = app.main.load_page("monkey", None, "v1", None, after, 10)
+        seen += page
+        if not has_more:
+            break
+        after = (-page[-1]["rank"], page[-1]["timestamp_sec"], page[-1]["id"])
+    assert [c["id"] for c in seen] == list(range(45))
+    # Page 1 ranks two pages' worth; page 3 runs past them and the deeper
+    # fetch finds every match, so the remaining pages are cache hits
+    assert depths == [22, 62]
+
+def test_boosted_rows_found_by_deeper_fetches_are_skipped(monkeypatch):
+    """Pin the documented limit: a row boosted above an earlier cursor by a deeper fetch is never served."""
+    import app.main
+    # SQL order is list order; row 30 is only fetched past the first depth, but its boosted rank beats page 1
+    corpus = [{"id": i, "rank": 1.0 / (i + 1), "timestamp_sec": i} for i in range(45)]
+    corpus[30]["rank"] = 5.0
+
+    monkeypatch.setattr(app.main, "run_search", lambda q, top_k, speaker, deadline: (corpus[:top_k], False, False))
+    monkeypatch.setattr(app.main, "page_candidates", TTLCache(8, 60))
+    seen, after = [], None
+    while True:
+        page, has_more, _, _ = app.main.load_page("monkey", None, "v1", None, after, 10)
+        seen += page
+        if not has_more:
+            break
+        after = (-page[-1]["rank"], page[-1]["timestamp_sec"], page[-1]["id"])
+    ids = [c["id"] for c in seen]
+    assert 30 not in ids
+    assert sorted(ids) == [i for i in range(45) if i != 30]
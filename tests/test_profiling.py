@@ -0,0 +1,36 @@
+# Test that the search profiler reports stage timings and hot functions.
+from app.profiling import SearchProfiler, stage
+
+def _fake_search(n):
+    """Stand-in for search_quotes with two timed stages."""
+    with stage("fts_query"):
+        total = sum(range(n))
+    with stage("rank"):
+        return sorted(str(i) for i in range(total % 100 + 5))
+
+def test_profiler_reports_stages_and_functions(tmp_path, monkeypatch):
+    """Test that stages, top functions and the dump file are all reported."""
+    monkeypatch.setattr("app.profiling.PROFILE_DIR", str(tmp_path))
+    profiler = SearchProfiler(dump_format="cprofile")
+    result = profiler.run(_fake_search, 1000)
+    report = profiler.report()
+
+    assert result
+    assert [s["name"] for s in report["stages"]] == ["fts_query", "rank"]
+    assert any("_fake_search" in f["function"] for f in report["top_functions"])
+    assert report["dump_path"] and (tmp_path / report["dump_path"].split("/")[-1]).exists()
+
+def test_stage_is_noop_without_profiler():
+    """Test that stage() does nothing outside a profiled call."""
+    with stage("connect"):
+        pass
+
+def test_profiling_requires_configured_token(monkeypatch):
+    """Test that API profiling stays off without a token and needs an exact match."""
+    from app.profiling import profiling_allowed
+    monkeypatch.setattr("app.profiling.PROFILE_TOKEN", "")
+    assert not profiling_allowed("")
+    monkeypatch.setattr("app.profiling.PROFILE_TOKEN", "s3cret")
+    assert not profiling_allowed(None)
+    assert not profiling_allowed("wrong")
+    assert profiling_allowed("s3cret")
@@ -0,0 +1,47 @@
+# Test parsing of search query syntax into websearch text and filters.
+from app.query_syntax import parse_query
+
+def test_plain_query_is_not_structured():
+    """Queries without syntax parse to their own text."""
+    parsed = parse_query("Try both.")
+    assert parsed.text == "Try both."
+    assert parsed.websearch == "try both"
+    assert not parsed.structured
+
+def test_phrases_exclusions_and_or():
+    """Quoted phrases, -exclusions and OR become websearch_to_tsquery input."""
+    parsed = parse_query('"Cat food" -dog -"little monkey" OR Shakespeare')
+    assert parsed.websearch == '"cat food" -dog -"little monkey" or shakespeare'
+    assert parsed.text == "Cat food Shakespeare"
+    assert parsed.structured
+
+def test_lowercase_or_is_a_word():
+    """Only uppercase OR is an operator; a lowercase or stays a literal word."""
+    parsed = parse_query('"cat food" or dog -news')
+    assert parsed.websearch == '"cat food" "or" dog -news'
+    assert parsed.text == "cat food or dog"
+    assert parse_query('"cat food" OR dog').websearch == '"cat food" or dog'
+
+def test_field_prefixes():
+    """speaker:/episode: become filters; a leading minus excludes the value."""
+    parsed = parse_query("Speaker:Karl monkey news")
+    assert (parsed.speaker, parsed.text, parsed.structured) == ("karl", "monkey news", False)
+    parsed = parse_query('episode:xfm-s4e1 -speaker:ricky "try both')
+    assert parsed.episode == "xfm-s4e1"
+    assert parsed.excluded_speakers == ["ricky"]
+    assert parsed.websearch == '"try both"'
+    assert parsed.structured
+
+def test_min_should_match_selects_candidates_with_few_rare_words(monkeypatch):
+    """Only n - k + 1 words select candidates, never stop words while others remain."""
+    from app.search_core import min_should_match_sql
+    # No corpus frequencies loaded: longer words are taken as rarer
+    monkeypatch.setattr("app.spelling._index", None)
+    # 5 content lexemes, 4 must match: any 2 of them find every match
+    candidates, any_word, _, params = min_should_match_sql("karl pilkington is a little round head", "english", "doc")
+    assert candidates.count("plainto_tsquery") == 2 and any_word.count("plainto_tsquery") == 5
+    assert {params["term0"], params["term1"]} == {"pilkington", "little"}
+    # Under 'simple' every word counts, but the longest stop words select candidates
+    candidates, _, _, params = min_should_match_sql("it is what it is and that", "simple", "doc")
+    assert candidates.count("plainto_tsquery") == 2
+    assert {params["term0"], params["term1"]} == {"that", "what"}
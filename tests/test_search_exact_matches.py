@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from app.search_core import search_quotes, normalize_query
+from app.search_core import search_quotes, iter_matches, normalize_query
 
 # Skip tests if DATABASE_URL is not set
 pytestmark = pytest.mark.skipif(
@@ -127,11 +127,109 @@ class TestPhraseMatching:
         assert is_phrase_query("single") == False
         assert is_phrase_query("this is a very long query with many words") == False
     
+    def test_stop_word_phrase_uses_simple_config(self):
+        """Test that phrases made of stop words are routed to the 'simple' index and still match."""
+        from app.search_core import fts_config
+        
+        assert fts_config("it is what it is") == "simple"
+        assert fts_config("try both") == "simple"
+        assert fts_config("cat food") == "english"
+        assert fts_config("the") == "english"
+        
+        results = search_quotes("it is what it is", top_k=5)
+        assert all("what" in normalize_query(r["text"]).split() for r in results)
+    
+    def test_single_word_postings_match_live_ranking(self, monkeypatch):
+        """Test that precomputed postings rank single words exactly like live ranking."""
+        import app.search_core
+        
+        for speaker in (None, "karl"):
+            with_postings = search_quotes("monkey", top_k=10, speaker_filter=speaker)
+            monkeypatch.setattr(app.search_core, "POSTINGS_DEPTH", 0)
+            live = search_quotes("monkey", top_k=10, speaker_filter=speaker)
+            monkeypatch.undo()
+            # Rows tied on (rank, timestamp) may come back in either order
+            assert [(r["rank"], r["timestamp_sec"]) for r in with_postings] == \
+                [(r["rank"], r["timestamp_sec"]) for r in live]
+    
+    def test_single_word_search_without_postings_table(self, monkeypatch):
+        """Test that single words fall back to live ranking until term_postings exists."""
+        import time
+        import app.postings
+
+        assert app.postings.postings_available()
+        with_postings = search_quotes("monkey", top_k=10)
+        # Pretend migration 7 hasn't run: the table was just found missing
+        monkeypatch.setattr(app.postings, "_table_exists", False)
+        monkeypatch.setattr(app.postings, "_missing_since", time.monotonic())
+        assert not app.postings.postings_available()
+        live = search_quotes("monkey", top_k=10)
+        assert [(r["rank"], r["timestamp_sec"]) for r in with_postings] == \
+            [(r["rank"], r["timestamp_sec"]) for r in live]
+
+    def test_bm25_keeps_exact_matches_first(self, monkeypatch):
+        """Test that BM25 ranking keeps exact matches above every partial match."""
+        import app.search_core
+        
+        monkeypatch.setattr(app.search_core, "SEARCH_RANKER", "bm25")
+        results = search_quotes("cat food", top_k=10, speaker_filter="karl")
+        assert normalize_query(results[0]["text"]) == "cat food"
+        assert all(r["rank"] < 100 for r in results[1:])
+        assert all(r["speaker"] == "karl" for r in results)
+    
     def test_single_word_fallback(self):
         """Test that single word queries still work."""
         results = search_quotes("knob", top_k=5, speaker_filter="karl")
         assert len(results) > 0, "Single word search should return results"
 
+    def test_export_matches_search(self):
+        """Test that exports find what search finds, including stop-word queries and syntax."""
+        for query in ("it is what it is", "monkey -news"):
+            results = search_quotes(query, top_k=20)
+            exported = {(r["episode_id"], r["timestamp_sec"]) for r in iter_matches(query)}
+            assert results, f"'{query}' should have search results"
+            assert all((r["episode_id"], r["timestamp_sec"]) in exported for r in results)
+
+    def test_min_should_match_cap_is_deterministic_and_flagged(self, monkeypatch):
+        """Test that capped candidates are the same on every run and mark results partial."""
+        import app.search_core
+        from app.deadlines import SearchDeadline
+
+        query = "karl pilkington is a little round head"
+        deadline = SearchDeadline()
+        assert search_quotes(query, top_k=10, deadline=deadline)
+        assert not deadline.partial
+        monkeypatch.setattr(app.search_core, "MIN_SHOULD_MATCH_MAX_CANDIDATES", 50)
+        runs = []
+        for _ in range(3):
+            deadline = SearchDeadline()
+            runs.append([r["id"] for r in search_quotes(query, top_k=10, deadline=deadline)])
+            assert deadline.partial
+        assert runs[0] == runs[1] == runs[2]
+
+    def test_context_follows_transcript_order(self):
+        """Test that context lines come from either side of the anchor line, in transcript order."""
+        from app.search_core import get_context, get_transcript_page
+
+        result = search_quotes("monkey", top_k=1)[0]
+        anchor = (result["episode_id"], result["timestamp_sec"], result["id"])
+        context = get_context([anchor], 3)[0]
+        lines = get_transcript_page(result["episode_id"], limit=10000)["lines"]
+        position = next(i for i, line in enumerate(lines) if line["id"] == result["id"])
+        assert [line["text"] for line in context["before"]] == [line["text"] for line in lines[max(0, position - 3):position]]
+        assert [line["text"] for line in context["after"]] == [line["text"] for line in lines[position + 1:position + 4]]
+
+    def test_facets_count_every_match(self):
+        """Test that facets return the full match total and per-speaker counts."""
+        plain = search_quotes("knob", top_k=5, speaker_filter="karl")
+        facets = {}
+        results = search_quotes("knob", top_k=5, speaker_filter="karl", facets=facets)
+        assert [r["id"] for r in results] == [r["id"] for r in plain]
+        assert facets["total"] >= len(results)
+        # Speaker counts ignore the speaker filter so other speakers stay visible
+        assert facets["speaker"]["karl"] == facets["total"]
+        assert sum(facets["speaker"].values()) >= facets["total"]
+
 
 class TestNormalization:
     """Test query normalization."""
@@ -0,0 +1,26 @@
+# Test the keys that decide which searches share a flight.
+from app.main import search_flight_key
+
+def test_flight_key_separates_budgets():
+    """A tight client budget must not govern searches with the default budget."""
+    default = search_flight_key("try both", None, 5, True, "fts", False, 5000)
+    assert search_flight_key("Try both!", None, 5, True, "fts", False, 5000) == default
+    assert search_flight_key("try both", None, 5, True, "fts", False, 1) != default
+
+def test_query_syntax_keeps_searches_apart():
+    """Queries that differ only in syntax never share a flight or a cursor."""
+    import pytest
+    from app.main import search_page_fingerprint
+    from app.pagination import InvalidCursor, encode_cursor, decode_cursor
+
+    pairs = [("monkey -news", "monkey news"), ('"try both"', "try both"), ("karl OR ricky", "karl or ricky"),
+             ("speaker:karl monkey", "speaker karl monkey"), ("monkey episode:xfm-s1e1", "monkey")]
+    for a, b in pairs:
+        assert search_flight_key(a, None, 5, True, "fts", False, 5000) != \
+            search_flight_key(b, None, 5, True, "fts", False, 5000), (a, b)
+        token = encode_cursor(search_page_fingerprint(a, None), {"id": 1, "rank": 1.0, "timestamp_sec": 5})
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token, search_page_fingerprint(b, None))
+    # Punctuation and case in plain queries still coalesce
+    assert search_flight_key("Try both.", None, 5, True, "fts", False, 5000) == \
+        search_flight_key("try both", None, 5, True, "fts", False, 5000)
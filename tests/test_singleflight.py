@@ -0,0 +1,100 @@
+# Test that concurrent identical calls share one execution.
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import metrics
+from app.singleflight import SingleFlight
+
+def test_threaded_callers_share_one_execution():
+    """Test that sync callers with the same key coalesce onto one call."""
+    metrics.reset()
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def slow_search(query):
+        calls.append(query)
+        release.wait(2)
+        return [query]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "try both", slow_search, "try both") for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == ["try both"] for r in results)
+    counters = metrics.snapshot()
+    assert counters["test.executions"] == 1
+    assert counters["test.coalesced"] == 7
+
+def test_async_callers_share_errors():
+    """Test that async callers coalesce and all see the leader's exception."""
+    flight = SingleFlight("test_async")
+    calls = []
+
+    def failing_search():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("database down")
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.do_async("key", failing_search) for _ in range(5)],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.in_flight() == 0
+
+def test_abandon_called_when_last_async_waiter_cancels():
+    """Test that the execution is told to stop once nobody is waiting."""
+    flight = SingleFlight("test_abandon")
+    abandoned = threading.Event()
+
+    def slow_search():
+        abandoned.wait(2)
+        return []
+
+    async def run():
+        waiters = [asyncio.ensure_future(flight.do_async("key", slow_search, on_abandon=abandoned.set))
+                   for _ in range(3)]
+        await asyncio.sleep(0.05)
+        waiters[0].cancel()
+        await asyncio.sleep(0.05)
+        assert not abandoned.is_set()
+        for w in waiters[1:]:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    asyncio.run(run())
+    assert abandoned.is_set()
+
+def test_call_after_abandon_starts_a_fresh_flight():
+    """Test that a new identical call doesn't join a flight that is being cancelled."""
+    flight = SingleFlight("test_rejoin")
+    cancelled = threading.Event()
+    calls = []
+
+    def search():
+        calls.append(1)
+        if len(calls) == 1:
+            # The first execution only ends once it is told to stop
+            cancelled.wait(2)
+            raise RuntimeError("cancelled")
+        return ["fresh"]
+
+    async def run():
+        first = asyncio.ensure_future(flight.do_async("key", search, on_abandon=cancelled.set))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        return await flight.do_async("key", search)
+
+    assert asyncio.run(run()) == ["fresh"]
+    assert len(calls) == 2
+    assert flight.in_flight() == 0
@@ -0,0 +1,43 @@
+# Test that the local SQLite snapshot serves searches like search_quotes.
+from app.snapshot import build_snapshot, search_snapshot, snapshot_version, snapshot_stats
+
+ROWS = [
+    {"episode_id": "xfm-s4e1", "timestamp_sec": 100, "speaker": "karl", "text": "Try both.",
+     "episode_name": "S04E01", "spotify_url": "https://open.spotify.com/episode/a"},
+    {"episode_id": "xfm-s4e1", "timestamp_sec": 200, "speaker": "ricky", "text": "Karl, you can't try both of them at once.",
+     "episode_name": "S04E01", "spotify_url": "https://open.spotify.com/episode/a"},
+    {"episode_id": "xfm-s1e1", "timestamp_sec": 123, "speaker": "karl", "text": "I could eat a knob at night",
+     "episode_name": "Pilot", "spotify_url": ""},
+]
+
+def test_snapshot_search_ranks_exact_match_first(tmp_path):
+    """Test that exact matches rank first and the speaker filter applies."""
+    path = str(tmp_path / "snapshot.db")
+    build_snapshot(ROWS, "v1", path)
+    assert snapshot_version(path) == "v1"
+
+    results = search_snapshot("try both", top_k=5, path=path)
+    assert [r["text"] for r in results] == ["Try both.", "Karl, you can't try both of them at once."]
+    assert results[0]["rank"] > 100
+    assert results[0]["timestamp_hms"] == "00:01:40"
+
+    assert [r["speaker"] for r in search_snapshot("try both", speaker_filter="ricky", path=path)] == ["ricky"]
+    assert search_snapshot("knob", path=path)[0]["episode_id"] == "xfm-s1e1"
+
+def test_snapshot_rebuild_replaces_file(tmp_path):
+    """Test that rebuilding swaps in the new corpus and version."""
+    path = str(tmp_path / "snapshot.db")
+    build_snapshot(ROWS, "v1", path)
+    build_snapshot(ROWS[:1], "v2", path)
+    assert snapshot_version(path) == "v2"
+    assert snapshot_stats(path)["total_quotes"] == 1
+
+def test_snapshot_search_applies_query_syntax(tmp_path):
+    """Test that degraded searches honour speaker:, episode: and -exclusions instead of matching them as words."""
+    path = str(tmp_path / "snapshot.db")
+    build_snapshot(ROWS, "v1", path)
+    assert [r["speaker"] for r in search_snapshot("speaker:karl try both", path=path)] == ["karl"]
+    assert search_snapshot("speaker:karl try both", speaker_filter="ricky", path=path) == []
+    assert [r["speaker"] for r in search_snapshot("try both -speaker:karl", path=path)] == ["ricky"]
+    assert [r["text"] for r in search_snapshot("try both -once", path=path)] == ["Try both."]
+    assert search_snapshot("try both episode:xfm-s1e1", path=path) == []
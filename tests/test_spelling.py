@@ -0,0 +1,52 @@
+# Test the symmetric-delete spelling corrector.
+from app.spelling import SpellingIndex, edit_distance
+
+VOCABULARY = {"monkey": 50, "news": 40, "pilkington": 30, "karl": 60, "head": 20, "heat": 2, "carl": 1}
+
+def test_corrects_typos_to_frequent_known_words():
+    """Test insertions, deletions, substitutions and transpositions."""
+    index = SpellingIndex(VOCABULARY)
+    assert index.correct("monky nwes") == "monkey news"
+    assert index.correct("pilkingtn") == "pilkington"
+    # Equal distance: the more frequent word wins
+    assert index.correct_word("hea") == "head"
+
+def test_leaves_known_and_unfixable_words_alone():
+    """Test that correct queries give no suggestion and distant words are kept."""
+    index = SpellingIndex(VOCABULARY)
+    assert index.correct("monkey news") is None
+    assert index.correct_word("xylophone") == "xylophone"
+    # Rare vocabulary words are never offered, even when closer
+    assert "carl" not in index.vocabulary
+    assert index.correct_word("carll") == "karl"
+
+def test_edit_distance_counts_transpositions_once():
+    """Test the optimal string alignment distance and its early exit."""
+    assert edit_distance("nwes", "news", 2) == 1
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3
+
+def test_failed_rebuild_backs_off(monkeypatch):
+    """Test that a failed rebuild isn't retried on every search, and answers stay uncacheable."""
+    import app.database
+    import app.spelling
+
+    def unavailable():
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(app.database, "get_read_connection", unavailable)
+    monkeypatch.setattr(app.spelling, "_index", None)
+    monkeypatch.setattr(app.spelling, "_index_version", None)
+    monkeypatch.setattr(app.spelling, "_failed_at", None)
+    assert app.spelling.refresh_if_stale("v1")
+    # Wait for the background rebuild to fail
+    with app.spelling._rebuild_lock:
+        pass
+    assert app.spelling._failed_at is not None
+    assert not app.spelling.refresh_if_stale("v1")
+    assert not app.spelling.is_current("v1")
+    monkeypatch.setattr(app.spelling, "_failed_at", 0.0)
+    monkeypatch.setattr(app.spelling, "SPELLING_RETRY_INTERVAL", 0.0)
+    assert app.spelling.refresh_if_stale("v1")
+    with app.spelling._rebuild_lock:
+        pass
@@ -0,0 +1,65 @@
+# Cold-start regression tests: import time and time-to-first-response budgets.
+import os
+import subprocess
+import sys
+from pathlib import Path
+from app.snapshot import build_snapshot
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Generous defaults so slow CI machines pass; tighten locally via env vars
+CLI_IMPORT_BUDGET_MS = float(os.getenv("CLI_IMPORT_BUDGET_MS", "1500"))
+APP_IMPORT_BUDGET_MS = float(os.getenv("APP_IMPORT_BUDGET_MS", "3000"))
+APP_FIRST_RESPONSE_BUDGET_MS = float(os.getenv("APP_FIRST_RESPONSE_BUDGET_MS", "5000"))
+
+# Modules a one-off CLI search must never pay for
+CLI_FORBIDDEN_MODULES = ("fastapi", "starlette", "sqlalchemy.orm", "cProfile", "pstats", "uvicorn")
+
+def _run_python(args, env_overrides=None):
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT), "DATABASE_URL": "", **(env_overrides or {})}
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+def _import_times(module: str) -> dict:
+    """Run `python -X importtime -c "import module"`; return {module: cumulative_ms}."""
+    proc = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+def test_cli_import_stays_lean():
+    """The search CLI imports no web framework, ORM or profiler, within its budget."""
+    times = _import_times("cli.search_quotes")
+    loaded = [m for m in CLI_FORBIDDEN_MODULES if m in times]
+    assert not loaded, f"cli.search_quotes imports {loaded}"
+    assert times["cli.search_quotes"] < CLI_IMPORT_BUDGET_MS
+
+def test_app_import_budget():
+    """Importing app.main connects to nothing and fits the budget."""
+    times = _import_times("app.main")
+    assert "sqlalchemy.orm" not in times
+    assert times["app.main"] < APP_IMPORT_BUDGET_MS
+
+def test_app_time_to_first_response(tmp_path):
+    """A fresh process serves its first request (degraded, from a snapshot) within budget."""
+    snapshot_path = tmp_path / "snapshot.db"
+    build_snapshot([{"episode_id": "S1E1", "timestamp_sec": 1, "speaker": "karl",
+                     "text": "hello there", "episode_name": "Test", "spotify_url": ""}],
+                   "v1", str(snapshot_path))
+    script = (
+        "import time; start = time.perf_counter()\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "with TestClient(app) as client:\n"
+        "    assert client.get('/api/search', params={'q': 'hello', 'test': '1'}).status_code == 200\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    proc = _run_python(["-c", script], {"SNAPSHOT_PATH": str(snapshot_path)})
+    assert proc.returncode == 0, proc.stderr
+    elapsed_ms = float(proc.stdout.strip().splitlines()[-1])
+    assert elapsed_ms < APP_FIRST_RESPONSE_BUDGET_MS
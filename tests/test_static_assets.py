@@ -0,0 +1,40 @@
+# Test SPA fallback, per-encoding ETags and Vary on precompressed static files.
+import gzip
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+from app.static_assets import SPAStaticFiles
+
+def _client(tmp_path):
+    """App serving a tiny built frontend with one precompressed asset."""
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>" + "app " * 100 + "</html>")
+    script = b"console.log('hi');" * 100
+    (tmp_path / "assets" / "app-abc123.js").write_bytes(script)
+    (tmp_path / "assets" / "app-abc123.js.gz").write_bytes(gzip.compress(script))
+    app = Starlette(routes=[Mount("/", SPAStaticFiles(directory=str(tmp_path)))])
+    return TestClient(app)
+
+def test_missing_asset_is_404_but_routes_fall_back(tmp_path):
+    """Stale hashed assets 404 instead of returning index.html; client routes get the shell."""
+    client = _client(tmp_path)
+    assert client.get("/assets/app-old999.js").status_code == 404
+    page = client.get("/episodes/xfm-s1e1")
+    assert page.status_code == 200 and page.headers["content-type"].startswith("text/html")
+
+def test_index_etag_differs_per_encoding(tmp_path):
+    """Identity and gzip bodies of index.html never share an ETag."""
+    client = _client(tmp_path)
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != gzipped.headers["etag"]
+    revalidated = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]}).status_code == 200
+
+def test_identity_asset_varies_on_accept_encoding(tmp_path):
+    """The uncompressed copy of a precompressed asset still carries Vary."""
+    response = _client(tmp_path).get("/assets/app-abc123.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,21 @@
+# Test LIKE pattern building for substring and wildcard search modes.
+import pytest
+from app.search_core import substring_pattern
+
+def test_substring_pattern_normalizes_like_the_index():
+    """Punctuation and LIKE metacharacters become spaces, matching NORMALIZED_TEXT_SQL."""
+    assert substring_pattern("  Monkey's  NEWS!") == "%monkey s news%"
+    assert substring_pattern("100%_off\\") == "%100 off%"
+
+def test_wildcard_pattern_maps_star_and_question_mark():
+    """* and ? become % and _ in wildcard mode, and are stripped otherwise."""
+    assert substring_pattern("mon* n?ws", wildcard=True) == "%mon% n_ws%"
+    assert substring_pattern("mon* news") == "%mon news%"
+
+def test_pattern_requires_a_literal_run():
+    """Patterns without three consecutive literal characters are rejected."""
+    with pytest.raises(ValueError):
+        substring_pattern("ab")
+    with pytest.raises(ValueError):
+        substring_pattern("a*b?c*", wildcard=True)
+    assert substring_pattern("a*bcd", wildcard=True) == "%a%bcd%"
@@ -0,0 +1,36 @@
+# Test the in-memory suggestion index and its n-gram counting.
+from app.suggest import SuggestionIndex, count_ngrams, build_weights
+
+def test_lookup_returns_heaviest_completions_for_prefix():
+    """Test short (precomputed) and long (binary search) prefixes alike."""
+    index = SuggestionIndex({"monkey news": 9, "monkey": 5, "moon": 7, "monkey night": 2, "karl": 100},
+                            max_results=3, precompute_depth=2)
+    assert [s["text"] for s in index.lookup("mo")] == ["monkey news", "moon", "monkey"]
+    assert [s["text"] for s in index.lookup("monkey n")] == ["monkey news", "monkey night"]
+    assert index.lookup("monkey n", limit=1)[0] == {"text": "monkey news", "weight": 9}
+    assert index.lookup("zzz") == [] and index.lookup("") == []
+
+def test_count_ngrams_skips_stopword_edges():
+    """Test that n-grams can't start or end on a stopword, but may contain one."""
+    counts = count_ngrams(["a little bit of monkey news", "monkey news"], max_n=3)
+    assert counts["monkey news"] == 2
+    assert counts["bit of monkey"] == 1
+    assert "of monkey" not in counts and "a little" not in counts
+
+def test_build_weights_boosts_past_queries():
+    """Test that rare n-grams are dropped and searched phrases get extra weight."""
+    weights = build_weights({"monkey news": 4, "rare phrase": 1}, {"monkey news": 1, "ricky laugh": 2},
+                            min_count=2, max_phrases=10)
+    assert "rare phrase" not in weights
+    assert weights["monkey news"] > 4 and weights["ricky laugh"] > 0
+
+def test_index_is_current_only_for_its_version(monkeypatch):
+    """Test that answers are only cacheable once the index matches the dataset version."""
+    import app.suggest
+    monkeypatch.setattr(app.suggest, "_index", None)
+    monkeypatch.setattr(app.suggest, "_index_version", None)
+    assert not app.suggest.is_current("v1")
+    monkeypatch.setattr(app.suggest, "_index", SuggestionIndex({"monkey news": 3.0}))
+    monkeypatch.setattr(app.suggest, "_index_version", "v1")
+    assert app.suggest.is_current("v1")
+    assert not app.suggest.is_current("v2") and not app.suggest.is_current(None)